@@ -0,0 +1,75 @@
+import copy
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+RESULT_FILE_VARIABLE = "LOGGER_BENCH_RESULT_FILE"
+
+
+def write_config(customize=None, workdir=None):
+
+    # The fallback config, logging to log.txt in a fresh directory with the terminal off; customize edits it first
+    from logger.config_handler import HandleConfigs
+
+    workdir = workdir or tempfile.mkdtemp()
+    configs = copy.deepcopy(HandleConfigs.FALLBACK_CONFIGURATION)
+    configs["file_locations"]["log_file_path"] = os.path.join(workdir, "log.txt")
+    configs["output_configs"]["terminal"] = False
+
+    if customize is not None:
+        customize(configs)
+
+    config_path = os.path.join(workdir, "config.json")
+    with open(config_path, 'w') as config_file:
+        json.dump(configs, config_file)
+
+    return config_path, configs
+
+
+def make_logger(customize=None):
+
+    config_path, configs = write_config(customize)
+
+    from logger.logger import Logger
+
+    return Logger(config_path), configs
+
+
+def run_isolated(script, *arguments):
+
+    # Every run gets its own interpreter: Logger keeps class-level singletons, and peak RSS is only meaningful
+    # per process. The child hands its result back through report(); its stdout, terminal sink included, is dropped
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as result_file:
+        result_path = result_file.name
+
+    try:
+
+        completed = subprocess.run(
+            [sys.executable, os.path.abspath(script), *map(str, arguments)],
+            env=dict(os.environ, **{RESULT_FILE_VARIABLE: result_path}),
+            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, cwd=tempfile.gettempdir())
+
+        # The logger's own diagnostics are expected noise in some runs; they are only shown when the run fails
+        if completed.returncode != 0:
+            sys.stderr.write(completed.stderr)
+            completed.check_returncode()
+
+        with open(result_path, 'r') as result_file:
+            return json.load(result_file)
+
+    finally:
+        os.remove(result_path)
+
+
+def report(result):
+
+    # The child's side of run_isolated
+    with open(os.environ[RESULT_FILE_VARIABLE], 'w') as result_file:
+        json.dump(result, result_file)
@@ -0,0 +1,61 @@
+import os
+import sys
+import timeit
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from logger.config_handler import HandleConfigs
+from logger.format_util_ import FormatComponents
+from logger.log_compiler import CompileLog
+
+
+class LegacyCompileLog:
+
+    # Per-call work done by CompileLog.build_log before templates were precompiled
+
+    def __init__(self, error_map, log_components):
+
+        self.error_map = error_map
+        self.log_components = log_components
+
+    def build_log(self, message, error_level="DEFAULT", exception_traceback=None):
+
+        error_level_info = self.error_map.get(error_level, self.error_map["DEFAULT"])
+        level_key = error_level if error_level in self.error_map else "DEFAULT"
+
+        final_log = [
+            self.error_map[level_key]["color"].encode().decode("unicode_escape"),
+            f"[{datetime.now().strftime(self.log_components['timestamp_format'])}]\n",
+            f"[{error_level}] ",
+            f"{message}",
+            FormatComponents.get_traceback(
+                exception_traceback) if error_level_info["traceback"] and exception_traceback else ""
+        ]
+
+        return ''.join(final_log)
+
+
+def measure(compiler, number):
+
+    timer = timeit.Timer(lambda: compiler.build_log("benchmark message", "INFO"))
+    best = min(timer.repeat(repeat=5, number=number))
+
+    return best / number * 1e9
+
+
+def main(number=200000):
+
+    configs = HandleConfigs.FALLBACK_CONFIGURATION
+    error_map, log_components = configs["error_map"], configs["log_components"]
+
+    before = measure(LegacyCompileLog(error_map, log_components), number)
+    after = measure(CompileLog(error_map, log_components), number)
+
+    print(f"build_log before: {before:8.1f} ns/call")
+    print(f"build_log after:  {after:8.1f} ns/call")
+    print(f"speedup:          {before / after:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
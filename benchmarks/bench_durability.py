@@ -0,0 +1,61 @@
+from _harness import make_logger, report, run_isolated
+import sys
+import threading
+import time
+
+MODES = {
+    "none": {"mode": "none"},
+    "flush": {"mode": "flush"},
+    "fsync_batch": {"mode": "fsync_batch"},
+    "fsync_interval": {"mode": "fsync_interval"},
+    "fsync_level": {"mode": "fsync_level"},
+    "flush + wait on CRITICAL": {"mode": "flush", "wait_for_durable": True}
+}
+
+
+def run_mode(mode, records, producers):
+
+    log, _ = make_logger(lambda configs: configs["durability_configs"].update(MODES[mode]))
+    per_producer = records // producers
+
+    def produce():
+
+        # One record in a hundred is severe enough to ask for durability
+        for index in range(per_producer):
+            level = "CRITICAL" if index % 100 == 99 else "INFO"
+            log.log("Processed item %d", level, args=(index,))
+
+    threads = [threading.Thread(target=produce) for _ in range(producers)]
+    start = time.perf_counter()
+
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    log._output._flush_on_exit()
+    elapsed = time.perf_counter() - start
+
+    stats = log.stats()
+
+    return per_producer * producers / elapsed, stats["fsyncs"], stats["records_per_fsync"]["mean"]
+
+
+def main(records=100000, producers=8):
+
+    for mode in MODES:
+
+        throughput, fsyncs, per_fsync = run_isolated(__file__, mode, records, producers)
+        per_fsync = f"{per_fsync:8.1f}" if per_fsync is not None else "       -"
+
+        print(f"{mode:<26} {throughput:9.0f} rec/s, {fsyncs:>5} fsyncs, {per_fsync} records/fsync")
+
+
+if __name__ == "__main__":
+
+    if len(sys.argv) == 4:
+        report(run_mode(sys.argv[1], int(sys.argv[2]), int(sys.argv[3])))
+
+    else:
+        main()
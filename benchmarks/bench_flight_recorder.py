@@ -0,0 +1,58 @@
+from _harness import make_logger, report, run_isolated
+import sys
+import time
+
+MODES = {
+    "written": ({}, {}),
+    "flight recorder": ({"flight_recorder": True}, {}),
+    "filtered by min_level": ({}, {"min_level": "INFO"})
+}
+
+
+def run_debug(mode, records):
+
+    recorder_settings, output_settings = MODES[mode]
+
+    def customize(configs):
+
+        configs["output_configs"].update(output_settings)
+        configs["flight_recorder_configs"].update(recorder_settings)
+
+    log, _ = make_logger(customize)
+
+    # Caller-side cost of always-on DEBUG logging
+    start = time.perf_counter()
+
+    for index in range(records):
+        log.log("Cache lookup for %s took %d us", "DEBUG", args=("user:42", index))
+
+    caller = time.perf_counter() - start
+
+    # What one ERROR costs once the ring is full, up to the point everything is on disk
+    start = time.perf_counter()
+    log.log("Request failed", "ERROR")
+    log.flush()
+    trigger = time.perf_counter() - start
+
+    log._output._flush_on_exit()
+
+    return caller / records * 1e6, trigger * 1e3, log.stats()["records_written"]
+
+
+def main(records=200000):
+
+    for mode in MODES:
+
+        caller, trigger, written = run_isolated(__file__, mode, records)
+
+        print(f"{mode:<22} {caller:6.2f} us/record at the caller, "
+              f"ERROR + flush {trigger:7.1f} ms, {written:>7} lines written")
+
+
+if __name__ == "__main__":
+
+    if len(sys.argv) == 3:
+        report(run_debug(sys.argv[1], int(sys.argv[2])))
+
+    else:
+        main()
@@ -0,0 +1,67 @@
+from _harness import write_config
+import contextlib
+import io
+import multiprocessing
+import os
+import sys
+import time
+
+with contextlib.redirect_stdout(io.StringIO()):
+    from logger.multiprocess_handler import HandleMultiprocess
+
+
+def produce(process_logger, records):
+
+    for index in range(records):
+        process_logger.log("worker %d record %d", "INFO", args=(os.getpid(), index))
+
+
+def run_workers(workers, records):
+
+    config_path, configs = write_config(lambda configs: configs["batch_logging_configs"].update(batch_size=1000))
+    log_path = configs["file_locations"]["log_file_path"]
+
+    with contextlib.redirect_stdout(io.StringIO()):
+
+        writer = HandleMultiprocess(config_path).start()
+        per_worker = records // workers
+
+        start = time.perf_counter()
+
+        processes = [
+            multiprocessing.Process(target=produce, args=(writer.get_logger(), per_worker))
+            for _ in range(workers)
+        ]
+
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+
+        writer.stop()
+        elapsed = time.perf_counter() - start
+
+    with open(log_path, encoding='utf-8') as log_file:
+        written = log_file.read().count("[INFO]")
+
+    return written, per_worker * workers, written / elapsed
+
+
+def main(records=200000):
+
+    complete = True
+
+    for workers in (1, 2, 4, 8):
+
+        written, expected, rate = run_workers(workers, records)
+        print(f"{workers:>2} workers: {rate:>12,.0f} records/sec ({written}/{expected} written)")
+
+        complete = complete and written == expected
+
+    # A lost record is a failure, not a slower run
+    if not complete:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
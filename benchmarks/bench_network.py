@@ -0,0 +1,218 @@
+from _harness import make_logger, report, run_isolated
+import re
+import socket
+import socketserver
+import struct
+import sys
+import threading
+import time
+
+MODES = {
+    "batch_size=1": {"batch_size": 1},
+    "batch_size=500": {"batch_size": 500},
+    "batch_size=500, 4 connections": {"batch_size": 500, "connections": 4},
+    "collector down, spooling": {"batch_size": 500}
+}
+
+
+class Collector:
+
+    # A stand-in for a real collector: reads length-prefixed frames and splits them into their records.
+    # With keep, the records are kept in arrival order so a run can check what arrived
+    def __init__(self, port=0, keep=False):
+
+        self.records = 0
+        self.received = [] if keep else None
+        self.connections = []
+        self._lock = threading.Lock()
+
+        collector = self
+
+        class FrameHandler(socketserver.BaseRequestHandler):
+
+            def handle(self):
+
+                with collector._lock:
+                    collector.connections.append(self.request)
+
+                stream = self.request.makefile('rb')
+
+                while True:
+
+                    header = stream.read(4)
+                    if len(header) < 4:
+                        return
+
+                    payload = stream.read(struct.unpack(">I", header)[0])
+                    records = []
+                    offset = 0
+
+                    while offset < len(payload):
+
+                        end = offset + 4 + struct.unpack_from(">I", payload, offset)[0]
+                        records.append(payload[offset + 4:end])
+                        offset = end
+
+                    with collector._lock:
+
+                        collector.records += len(records)
+
+                        if collector.received is not None:
+                            collector.received.extend(records)
+
+        class Server(socketserver.ThreadingTCPServer):
+
+            daemon_threads = True
+            allow_reuse_address = True
+
+        self.server = Server(("127.0.0.1", port), FrameHandler)
+        self.port = self.server.server_address[1]
+
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def stop(self):
+
+        # Closes the listener and every open connection, as a collector going down would
+        self.server.shutdown()
+        self.server.server_close()
+
+        with self._lock:
+
+            # shutdown() rather than close(): the handler's makefile() keeps the socket open past a close()
+            for connection in self.connections:
+
+                try:
+
+                    connection.shutdown(socket.SHUT_RDWR)
+
+                except OSError:
+
+                    pass
+
+    def wait_for(self, records, timeout=10.0):
+
+        deadline = time.monotonic() + timeout
+
+        while self.records < records and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+
+def free_port():
+
+    # Bound and released, so nothing listens there for the "collector down" run
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def make_network_logger(port, settings):
+
+    def customize(configs):
+
+        configs["output_configs"]["file"] = False
+        configs["output_configs"]["sinks"]["collector"] = dict(settings, address=f"127.0.0.1:{port}")
+
+    log, _ = make_logger(customize)
+
+    return log
+
+
+def run_mode(mode, records, producers):
+
+    collector = Collector() if mode != "collector down, spooling" else None
+    port = collector.port if collector is not None else free_port()
+
+    log = make_network_logger(port, MODES[mode])
+    per_producer = records // producers
+
+    def produce():
+
+        for index in range(per_producer):
+            log.log("Processed item %d", "INFO", args=(index,))
+
+    threads = [threading.Thread(target=produce) for _ in range(producers)]
+    start = time.perf_counter()
+
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    log._output._flush_on_exit()
+    elapsed = time.perf_counter() - start
+
+    sink = log.stats()["sinks"]["collector"]
+    network = sink["network"]
+
+    # Rated on what got out, to the collector or the spool; records the sink's queue shed don't count
+    delivered = network["records_sent"] + network["records_spooled"]
+
+    return delivered / elapsed, delivered, sink["dropped"], network["frames_sent"], network["frames_spooled"]
+
+
+def check_replay(records):
+
+    # The collector goes down after the first third and comes back after the second: the second third
+    # must be spooled, then replayed ahead of the last third, with every record arriving once and in order
+    collector = Collector(keep=True)
+    port = collector.port
+
+    log = make_network_logger(port, {"batch_size": 100, "flush_interval": 0.05, "reconnect_delay": 0.2})
+    third = records // 3
+
+    def produce(start, stop):
+
+        for index in range(start, stop):
+            log.log("Processed item %d", "INFO", args=(index,))
+
+        log.flush()
+
+    produce(0, third)
+    collector.wait_for(third)
+    collector.stop()
+
+    produce(third, 2 * third)
+    spooled = log.stats()["sinks"]["collector"]["network"]["frames_spooled"]
+
+    restarted = Collector(port, keep=True)
+    time.sleep(0.5)
+
+    produce(2 * third, records)
+    restarted.wait_for(records - third)
+    log._output._flush_on_exit()
+
+    received = [int(re.search(rb"Processed item (\d+)", record).group(1))
+                for record in collector.received + restarted.received]
+
+    return received == list(range(records)), len(received), spooled
+
+
+def main(records=100000, producers=4):
+
+    for mode in MODES:
+
+        throughput, delivered, dropped, sent, spooled = run_isolated(__file__, mode, records, producers)
+
+        print(f"{mode:<31} {throughput:9.0f} rec/s delivered, {delivered:>6} of {records} records "
+              f"({dropped} dropped), {sent:>6} frames sent, {spooled:>5} spooled")
+
+    in_order, received, spooled = run_isolated(__file__, "--check-replay", records // 10)
+
+    print(f"{'collector restart, replay':<31} {'in order' if in_order else 'OUT OF ORDER OR LOST'}, "
+          f"{received} of {records // 10} records received, {spooled} frames spooled")
+
+    if not in_order:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+
+    if len(sys.argv) == 3 and sys.argv[1] == "--check-replay":
+        report(check_replay(int(sys.argv[2])))
+
+    elif len(sys.argv) == 4:
+        report(run_mode(sys.argv[1], int(sys.argv[2]), int(sys.argv[3])))
+
+    else:
+        main()
@@ -0,0 +1,55 @@
+from _harness import ROOT, write_config
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+
+RUNS = 15
+
+CHILD = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+clock = time.perf_counter
+started = clock()
+import logger
+imported = clock()
+from logger import Logger
+resolved = clock()
+log = Logger({config!r})
+constructed = clock()
+log.log("first record", "INFO")
+logged = clock()
+log.flush()
+flushed = clock()
+Logger({config!r})
+second = clock()
+print(json.dumps({{
+    "import_package": imported - started,
+    "resolve_logger": resolved - imported,
+    "construct": constructed - resolved,
+    "first_log_call": logged - constructed,
+    "first_log_to_disk": flushed - constructed,
+    "second_construct": second - flushed
+}}))
+"""
+
+
+def main():
+
+    workdir = tempfile.mkdtemp()
+    config_path, _ = write_config(workdir=workdir)
+    child = CHILD.format(root=ROOT, config=config_path)
+    samples = []
+
+    for _ in range(RUNS):
+
+        result = subprocess.run([sys.executable, "-c", child], capture_output=True, text=True, cwd=workdir, check=True)
+        samples.append(json.loads(result.stdout.strip().splitlines()[-1]))
+
+    for name in samples[0]:
+        print(f"{name:<20} median {statistics.median(sample[name] for sample in samples) * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+from _harness import make_logger, report, run_isolated
+import sys
+import time
+
+MODES = {
+    "off": {},
+    "dedup": {"dedup": True},
+    "rate_limit": {"rate_limit": True},
+    "dedup + rate_limit": {"dedup": True, "rate_limit": True}
+}
+
+
+def run_flood(mode, records):
+
+    log, _ = make_logger(lambda configs: configs["suppression_configs"].update(MODES[mode]))
+
+    try:
+        raise ConnectionError("dependency unavailable")
+    except ConnectionError as error:
+        failure = error
+
+    # The same CRITICAL line, traceback and all, from one call site: what a failing dependency looks like
+    start = time.perf_counter()
+
+    for _ in range(records):
+        log.log("Request to %s failed", "CRITICAL", failure, args=("db",))
+
+    log._output._flush_on_exit()
+    elapsed = time.perf_counter() - start
+
+    return elapsed, log.stats()["records_written"]
+
+
+def main(records=100000):
+
+    for mode in MODES:
+
+        elapsed, written = run_isolated(__file__, mode, records)
+
+        print(f"{mode:<19} {elapsed:7.2f} s for {records} records, {written:>7} lines written")
+
+
+if __name__ == "__main__":
+
+    if len(sys.argv) == 3:
+        report(run_flood(sys.argv[1], int(sys.argv[2])))
+
+    else:
+        main()
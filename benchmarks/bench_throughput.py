@@ -0,0 +1,52 @@
+from _harness import make_logger, report, run_isolated
+import sys
+import threading
+import time
+
+
+def run_producers(producers, records):
+
+    from logger.logger import Logger
+
+    Logger._compiler = None
+    Logger._output = None
+    log, _ = make_logger(lambda configs: configs["batch_logging_configs"].update(batch_size=1000))
+
+    per_thread = records // producers
+
+    def produce():
+
+        for index in range(per_thread):
+            log.log("benchmark record %d", "INFO", args=(index,))
+
+    threads = [threading.Thread(target=produce) for _ in range(producers)]
+
+    start = time.perf_counter()
+
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    log._output._flush_on_exit()
+    elapsed = time.perf_counter() - start
+
+    return per_thread * producers / elapsed
+
+
+def main(records=200000):
+
+    for producers in (1, 8, 32):
+
+        rate = run_isolated(__file__, producers, records)
+
+        print(f"{producers:>3} producers: {rate:>12,.0f} records/sec")
+
+
+if __name__ == "__main__":
+
+    if len(sys.argv) == 3:
+        report(run_producers(int(sys.argv[1]), int(sys.argv[2])))
+
+    else:
+        main()
@@ -0,0 +1,64 @@
+import copy
+import os
+import sys
+import timeit
+import traceback
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from logger.config_handler import HandleConfigs
+from logger.traceback_handler import HandleTracebacks
+
+
+def nested_failure(depth):
+
+    if depth == 0:
+        raise ConnectionError("dependency unavailable")
+
+    nested_failure(depth - 1)
+
+
+def chained_failure(depth):
+
+    try:
+        nested_failure(depth)
+    except ConnectionError as error:
+        raise RuntimeError("request failed") from error
+
+
+def capture(function, depth):
+
+    try:
+        function(depth)
+    except Exception as error:
+        return error
+
+
+def measure(render, error, number):
+
+    best = min(timeit.Timer(lambda: render(error)).repeat(repeat=5, number=number))
+
+    return best / number * 1e6
+
+
+def main(number=2000):
+
+    config = copy.deepcopy(HandleConfigs.FALLBACK_CONFIGURATION["traceback_configs"])
+    variants = (
+        ("traceback.format_exception", lambda error: ''.join(traceback.format_exception(None, error, error.__traceback__))),
+        ("cached", HandleTracebacks(config).format),
+        ("uncached", HandleTracebacks(dict(config, cache=False)).format),
+        ("cached, max_depth=5", HandleTracebacks(dict(config, max_depth=5)).format)
+    )
+
+    for label, function, depth in (("20 frames", nested_failure, 20), ("chained, 2 x 20 frames", chained_failure, 20)):
+
+        error = capture(function, depth)
+        print(label)
+
+        for name, render in variants:
+            print(f"  {name:<28} {measure(render, error, number):8.1f} us/record")
+
+
+if __name__ == "__main__":
+    main()
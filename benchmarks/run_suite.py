@@ -0,0 +1,216 @@
+from _harness import ROOT, report, run_isolated, write_config
+import argparse
+import itertools
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import threading
+import time
+
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+def nested_failure(depth):
+
+    if depth == 0:
+        raise ValueError("benchmark failure")
+
+    nested_failure(depth - 1)
+
+
+def make_exception(depth=20):
+
+    try:
+
+        nested_failure(depth)
+
+    except ValueError as error:
+
+        return error
+
+
+def percentile(sorted_values, rank):
+
+    if not sorted_values:
+        return 0
+
+    index = min(len(sorted_values) - 1, int(round(rank / 100 * (len(sorted_values) - 1))))
+
+    return sorted_values[index]
+
+
+def run_scenario(scenario):
+
+    def customize(configs):
+
+        configs["output_configs"]["terminal"] = scenario["terminal"]
+        configs["batch_logging_configs"]["batch_logging"] = scenario["batching"]
+        configs["batch_logging_configs"]["batch_size"] = 1000
+
+    config_path, configs = write_config(customize)
+
+    from logger.logger import Logger
+
+    Logger._compiler = None
+    Logger._output = None
+    log = Logger(config_path)
+
+    producers = scenario["producers"]
+    per_thread = scenario["records"] // producers
+    level = "CRITICAL" if scenario["traceback"] else "INFO"
+    error = make_exception() if scenario["traceback"] else None
+    latencies = [None] * producers
+    start_barrier = threading.Barrier(producers + 1)
+
+    def produce(slot):
+
+        samples = []
+        clock = time.perf_counter_ns
+        start_barrier.wait()
+
+        for index in range(per_thread):
+            before = clock()
+            log.log("benchmark record %d", level, error, args=(index,))
+            samples.append(clock() - before)
+
+        latencies[slot] = samples
+
+    threads = [threading.Thread(target=produce, args=(slot,)) for slot in range(producers)]
+
+    for thread in threads:
+        thread.start()
+
+    start_barrier.wait()
+    start = time.perf_counter()
+
+    for thread in threads:
+        thread.join()
+
+    enqueued = time.perf_counter() - start
+
+    # Closing the output drains the queue and flushes the file, so this is end-to-end to disk
+    log._output._flush_on_exit()
+    elapsed = time.perf_counter() - start
+
+    samples = sorted(itertools.chain.from_iterable(latencies))
+    records = len(samples)
+
+    result = dict(scenario)
+    result.update({
+        "records": records,
+        "caller_latency_ns": {
+            **{f"p{rank:g}": percentile(samples, rank) for rank in PERCENTILES},
+            "max": samples[-1] if samples else 0,
+            "mean": sum(samples) / records if records else 0
+        },
+        "enqueue_records_per_sec": records / enqueued if enqueued else 0,
+        "end_to_end_records_per_sec": records / elapsed if elapsed else 0,
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "log_bytes": os.path.getsize(configs["file_locations"]["log_file_path"]),
+        "logger_stats": log.stats()
+    })
+
+    report(result)
+
+
+def build_scenarios(arguments):
+
+    for batching, terminal, with_traceback, producers in itertools.product(
+            arguments.batching, arguments.terminal, arguments.traceback, arguments.producers):
+
+        yield {
+            "name": f"batching={'on' if batching else 'off'} terminal={'on' if terminal else 'off'} "
+                    f"traceback={'on' if with_traceback else 'off'} producers={producers}",
+            "batching": batching,
+            "terminal": terminal,
+            "traceback": with_traceback,
+            "producers": producers,
+            "records": arguments.records
+        }
+
+
+def describe_environment():
+
+    try:
+
+        revision = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+
+    except (OSError, subprocess.CalledProcessError):
+
+        revision = None
+
+    try:
+
+        from importlib.metadata import version, PackageNotFoundError
+
+        package_version = version("pylgx")
+
+    except (ImportError, PackageNotFoundError):
+
+        package_version = None
+
+    return {
+        "package_version": package_version,
+        "git_revision": revision,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "started_at": time.time()
+    }
+
+
+def parse_switches(text):
+
+    return [value.strip().lower() in ("1", "on", "true", "yes") for value in text.split(",")]
+
+
+def build_parser():
+
+    parser = argparse.ArgumentParser(description="Throughput and latency benchmarks for the logging pipeline.")
+    parser.add_argument("--output", default="benchmark_results.json", help="Where to write the JSON results.")
+    parser.add_argument("--records", type=int, default=20000, help="Records logged per scenario.")
+    parser.add_argument("--producers", type=lambda text: [int(value) for value in text.split(",")],
+                        default=[1, 4, 16, 64], help="Comma-separated producer thread counts.")
+    parser.add_argument("--batching", type=parse_switches, default=[True, False], help="e.g. on,off")
+    parser.add_argument("--terminal", type=parse_switches, default=[False, True], help="e.g. off,on")
+    parser.add_argument("--traceback", type=parse_switches, default=[False, True], help="e.g. off,on")
+    parser.add_argument("--scenario", help=argparse.SUPPRESS)
+
+    return parser
+
+
+def main(argv=None):
+
+    arguments = build_parser().parse_args(argv)
+
+    if arguments.scenario:
+        run_scenario(json.loads(arguments.scenario))
+        return 0
+
+    results = {"environment": describe_environment(), "scenarios": []}
+
+    for scenario in build_scenarios(arguments):
+
+        result = run_isolated(__file__, "--scenario", json.dumps(scenario))
+        results["scenarios"].append(result)
+
+        latency = result["caller_latency_ns"]
+        print(f"{result['name']:<62} {result['end_to_end_records_per_sec']:>11,.0f} rec/s  "
+              f"p50 {latency['p50'] / 1000:>7.1f}us  p99 {latency['p99'] / 1000:>8.1f}us  "
+              f"rss {result['peak_rss_kb'] / 1024:>6.1f}MB")
+
+    with open(arguments.output, 'w') as output:
+        json.dump(results, output, indent=2)
+
+    print(f"Results written to {arguments.output}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
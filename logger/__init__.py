@@ -1,7 +1,32 @@
-try:
+import importlib
 
-    from logger import Logger
+# Public names and the submodule each lives in; submodules are only imported on first use
+_EXPORTS = {
+    "Logger": "logger",
+    "get_logger": "logger",
+    "logx": "logger",
+    "AsyncLogger": "async_logger"
+}
 
-except ImportError:
+__all__ = list(_EXPORTS)
 
-    raise ImportError("The 'logger.py' module is required to initialize pylgx.")
\ No newline at end of file
+
+def __getattr__(name):
+
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    try:
+
+        module = importlib.import_module(f".{_EXPORTS[name]}", __name__)
+
+    except ImportError as error:
+
+        raise ImportError("The 'logger.py' module is required to initialize pylgx.") from error
+
+    return getattr(module, name)
+
+
+def __dir__():
+
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,198 @@
+from .output_handler import HandleOutput
+from .stats_handler import HandleStats
+from concurrent.futures import ThreadPoolExecutor
+import os
+import shutil
+import threading
+import time
+
+
+class HandleArchives:
+
+    ARCHIVE_PREFIX = "log_archive_"
+    EXTENSIONS = {"none": "", "gzip": ".gz", "lzma": ".xz"}
+
+    def __init__(self, rotation_config, archive_dir, stats=None):
+
+        self.archive_dir = archive_dir
+        self.stats = stats if stats is not None else HandleStats()
+        self.compression = rotation_config["compression"]
+
+        if self.compression not in HandleArchives.EXTENSIONS:
+            HandleOutput.log_internal_message(
+                f"Unknown archive compression '{self.compression}'. Archives will not be compressed")
+            self.compression = "none"
+
+        self.max_archives = rotation_config["max_archives"]
+        self.max_archive_bytes = rotation_config["max_archive_bytes"]
+        self.max_archive_age = rotation_config["max_archive_age"] # days
+
+        self._retention_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, rotation_config["compression_workers"]), thread_name_prefix="logger-archive")
+
+    def archive_path(self, created):
+
+        # Zero-padded, most significant field first, so names sort in rotation order
+        stamp = time.strftime("%Y%m%d_%H%M%S", time.localtime(created)) + f"_{int(created % 1 * 1e6):06d}"
+        base = os.path.join(self.archive_dir, f"{HandleArchives.ARCHIVE_PREFIX}{stamp}")
+
+        path, counter = f"{base}.txt", 0
+        while self.is_taken(path):
+            counter += 1
+            path = f"{base}_{counter}.txt"
+
+        return path
+
+    def is_taken(self, path):
+
+        return any(os.path.exists(path + extension) for extension in HandleArchives.EXTENSIONS.values())
+
+    def submit(self, archive_path):
+
+        # Compression and pruning run on the pool so the writer never waits on them
+        try:
+
+            self._executor.submit(self.process_archive, archive_path)
+
+        except RuntimeError:
+
+            # The pool refuses work once the interpreter is shutting down; finish the job here instead
+            self.process_archive(archive_path)
+
+    def process_archive(self, archive_path):
+
+        try:
+
+            if self.compression != "none":
+                self.compress(archive_path)
+
+        except FileNotFoundError:
+
+            # Already pruned by a retention pass from an earlier rotation
+            pass
+
+        except OSError as error:
+
+            # The archive stays uncompressed, where retention still counts and prunes it
+            HandleOutput.log_internal_message(
+                f"Couldn't compress archive {archive_path}. Keeping it uncompressed", exception_traceback=error)
+
+        try:
+
+            self.apply_retention()
+
+        except OSError as error:
+
+            HandleOutput.log_internal_message(
+                f"An error occured whilst processing archive {archive_path}.", exception_traceback=error)
+
+    def compress(self, archive_path):
+
+        if self.compression == "gzip":
+            import gzip
+            opener = gzip.open
+        else:
+            import lzma
+            opener = lzma.open
+
+        compressed_path = archive_path + HandleArchives.EXTENSIONS[self.compression]
+        pending_path = compressed_path + ".tmp"
+        started = time.perf_counter()
+
+        try:
+
+            with open(archive_path, 'rb') as source, opener(pending_path, 'wb') as target:
+                shutil.copyfileobj(source, target, 1024 * 1024)
+
+            os.replace(pending_path, compressed_path)
+
+        except OSError:
+
+            # list_archives skips .tmp files, so a partial one left here would never be pruned
+            try:
+
+                os.remove(pending_path)
+
+            except FileNotFoundError:
+
+                pass
+
+            raise
+        os.remove(archive_path)
+
+        self.stats.increment("archives_compressed")
+        self.stats.observe("compression_duration", time.perf_counter() - started)
+
+        HandleOutput.log_internal_message(f"Compressed archive as {os.path.basename(compressed_path)}.")
+
+    def list_archives(self):
+
+        archives = []
+
+        for entry in os.scandir(self.archive_dir or '.'):
+
+            if entry.name.startswith(HandleArchives.ARCHIVE_PREFIX) and not entry.name.endswith((".tmp", ".idx")) \
+                    and entry.is_file():
+
+                stat = entry.stat()
+                archives.append((entry.name, entry.path, stat.st_size, stat.st_mtime))
+
+        archives.sort()
+
+        return archives
+
+    def apply_retention(self):
+
+        if not (self.max_archives or self.max_archive_bytes or self.max_archive_age):
+            return
+
+        with self._retention_lock:
+
+            archives = self.list_archives()
+            oldest_allowed = time.time() - self.max_archive_age * 86400
+            total_bytes = sum(size for _, _, size, _ in archives)
+
+            for index, (name, path, size, modified) in enumerate(archives):
+
+                remaining = len(archives) - index
+
+                if not (self.max_archives and remaining > self.max_archives) \
+                        and not (self.max_archive_bytes and total_bytes > self.max_archive_bytes) \
+                        and not (self.max_archive_age and modified < oldest_allowed):
+                    break
+
+                total_bytes -= size
+
+                try:
+
+                    os.remove(path)
+
+                except FileNotFoundError:
+
+                    # Compressed and replaced while this pass was running
+                    continue
+
+                self.remove_sidecar(path)
+
+                HandleOutput.log_internal_message(f"Removed archive {name} under the retention policy.")
+
+    @staticmethod
+    def remove_sidecar(path):
+
+        for extension in HandleArchives.EXTENSIONS.values():
+
+            if extension and path.endswith(extension):
+                path = path[:-len(extension)]
+
+        try:
+
+            os.remove(path + ".idx")
+
+        except FileNotFoundError:
+
+            pass
+
+    def shutdown(self, wait=True):
+
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,97 @@
+from .logger import Logger
+import asyncio
+from collections import deque
+
+
+class AsyncLogger:
+
+    RETRY_DELAY = 0.01
+
+    def __init__(self, config_path=None, max_pending=10000):
+
+        self.logger = Logger(config_path)
+        self.max_pending = max_pending
+
+        self._pending = deque()
+        self._handoff_scheduled = False
+        self._closed = False
+
+        self.dropped = 0
+
+    def log(self, message, level, exception_traceback=None, args=None, extra=None):
+
+        # Only touches a loop-local deque; formatting and disk I/O stay on the writer thread
+        if self._closed:
+            return
+
+        admitted = self.logger.admit(message, level, exception_traceback, args, extra)
+        if admitted is None:
+            return
+
+        _, record, dumped = admitted
+        pending = self._pending
+        room = self.max_pending - len(pending)
+
+        if room <= 0:
+            self.dropped += 1 + len(dumped or ())
+            return
+
+        # A flight recorder dump goes through the deque too, so it stays in order with what is already waiting;
+        # when it doesn't all fit, its oldest records are the ones dropped
+        if dumped:
+
+            if len(dumped) >= room:
+                self.dropped += len(dumped) - room + 1
+                dumped = dumped[len(dumped) - room + 1:]
+
+            pending.extend(dumped)
+
+        pending.append(record)
+
+        if not self._handoff_scheduled:
+            self._handoff_scheduled = True
+            asyncio.get_running_loop().call_soon(self._hand_off)
+
+    async def flush(self, durable=False):
+
+        self._hand_off()
+
+        while self._pending:
+            await asyncio.sleep(AsyncLogger.RETRY_DELAY)
+
+        loop = asyncio.get_running_loop()
+        flushed = loop.create_future()
+
+        self.logger._output.request_flush(
+            lambda: loop.call_soon_threadsafe(AsyncLogger._resolve, flushed), durable)
+
+        await flushed
+
+    async def aclose(self):
+
+        await self.flush()
+        self._closed = True
+
+    def _hand_off(self):
+
+        self._handoff_scheduled = False
+
+        if not self._pending:
+            return
+
+        records = list(self._pending)
+        self._pending.clear()
+
+        # Never wait for room on the loop; whatever the writer can't take yet is retried shortly
+        taken = self.logger._output.log_queue.put_many(records, block=False)
+
+        if taken < len(records):
+            self._pending.extendleft(reversed(records[taken:]))
+            self._handoff_scheduled = True
+            asyncio.get_running_loop().call_later(AsyncLogger.RETRY_DELAY, self._hand_off)
+
+    @staticmethod
+    def _resolve(future):
+
+        if not future.done():
+            future.set_result(None)
@@ -1,39 +1,53 @@
-from .output_handler import HandleOutput
 import time
 import threading
 
 class HandleBatching:
 
-    def __init__(self, file, batch_config):
+    def __init__(self, writer, batch_config, flush_writer=True):
 
-        self.file_path = file
+        self.writer = writer
+        self.flush_writer = flush_writer
 
         self.log_buffer_max_size = batch_config["batch_size"]
         self.flush_interval = batch_config["flush_interval"]
 
         self._lock = threading.Lock()
 
-        self.last_flush_time = time.time()
+        self.last_flush_time = time.monotonic()
 
-    def flush(self, buffer, override= False):
+    def flush(self, buffer, override= False, created=None):
 
         with self._lock:
 
             if buffer or override:
 
-                with open(self.file_path, 'a', encoding='utf-8') as log_file:
-                    log_file.write('\n'.join(buffer) + '\n')
+                try:
 
-                buffer.clear()
-                self.last_flush_time = time.time()
-                HandleOutput.log_internal_message(f"Flushed {self.log_buffer_max_size} logs")
+                    if self.writer is not None:
+                        self.writer.write(buffer, created)
+
+                        if self.flush_writer:
+                            self.writer.flush()
+
+                finally:
+                    # Once handed over, the lines belong to the writer's buffer, which keeps what
+                    # a failed write left behind; clearing here keeps a retry from writing them twice
+                    buffer.clear()
+                    self.last_flush_time = time.monotonic()
+
+                    # Per-line times travel in a list alongside the buffer
+                    if created is not None:
+                        created.clear()
+
+    def time_until_flush(self):
+
+        return max(0.0, self.last_flush_time + self.flush_interval - time.monotonic())
 
     def check_batching_condition(self, buffer):
 
             if len(buffer) >= self.log_buffer_max_size \
-                or time.time() - self.last_flush_time >= self.flush_interval:
+                or time.monotonic() - self.last_flush_time >= self.flush_interval:
 
                 return True
             
             return False
-
@@ -0,0 +1,429 @@
+from .index_handler import HandleIndex
+import argparse
+import json
+import mmap
+import os
+import re
+import sys
+import time
+from datetime import datetime
+
+
+class HandleSearch:
+
+    ANSI_PATTERN = re.compile(rb"\x1b\[[0-9;]*m")
+    HEADER_PATTERN = re.compile(rb"^\[(.+)\]$")
+    LEVEL_PATTERN = re.compile(rb"^\[([A-Za-z_]+)\] ")
+
+    ARCHIVE_PREFIX = "log_archive_"
+    ARCHIVE_STAMP = re.compile(r"^log_archive_(\d{8}_\d{6}_\d{6})")
+
+    DEFAULT_TIMESTAMP_FORMAT = "%Y-%m-%d / %Hh-%Mm-%Ss"
+
+    def __init__(self, levels=None, since=None, until=None, contains=None, timestamp_format=None):
+
+        self.levels = set(levels) if levels else None
+        self.since = since
+        self.until = until
+        self.contains = contains.encode('utf-8') if contains else None
+        self.timestamp_format = timestamp_format or HandleSearch.DEFAULT_TIMESTAMP_FORMAT
+
+    def log_files(self, log_path, include_archives=True):
+
+        # Archives first, oldest to newest, then the live log
+        paths = []
+
+        if include_archives:
+
+            archive_dir = os.path.dirname(log_path) or '.'
+
+            for name in sorted(os.listdir(archive_dir)):
+
+                if not name.startswith(HandleSearch.ARCHIVE_PREFIX) or name.endswith((".tmp", ".idx")):
+                    continue
+
+                if self.since is not None and self.archive_predates(name, self.since):
+                    continue
+
+                paths.append(os.path.join(archive_dir, name))
+
+        if os.path.exists(log_path):
+            paths.append(log_path)
+
+        return paths
+
+    @staticmethod
+    def archive_predates(name, since):
+
+        # Archives are named after the moment they were rotated out, so nothing inside is newer
+        match = HandleSearch.ARCHIVE_STAMP.match(name)
+
+        if match is None:
+            return False
+
+        rotated_at = datetime.strptime(match.group(1), "%Y%m%d_%H%M%S_%f").timestamp()
+
+        return rotated_at < since
+
+    @staticmethod
+    def iter_lines(path, start=0, end=None):
+
+        if path.endswith(".gz"):
+            import gzip
+            yield from HandleSearch.iter_stream_lines(gzip.open(path, 'rb'), start, end)
+            return
+
+        if path.endswith(".xz"):
+            import lzma
+            yield from HandleSearch.iter_stream_lines(lzma.open(path, 'rb'), start, end)
+            return
+
+        with open(path, 'rb') as log_file:
+
+            size = os.fstat(log_file.fileno()).st_size
+            end = size if end is None else min(end, size)
+
+            if start >= end:
+                return
+
+            # Mapping keeps memory flat however large the file is; pages are read in on demand
+            with mmap.mmap(log_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+
+                position = start
+
+                while position < end:
+
+                    newline = mapped.find(b"\n", position, end)
+                    line_end = end if newline == -1 else newline + 1
+
+                    yield position, mapped[position:line_end]
+                    position = line_end
+
+    @staticmethod
+    def iter_stream_lines(stream, start=0, end=None):
+
+        with stream:
+
+            # Compressed streams can't be mapped, but seeking still skips parsing everything before start
+            position = stream.seek(start)
+
+            for line in stream:
+
+                if end is not None and position >= end:
+                    return
+
+                yield position, line
+                position += len(line)
+
+    def iter_records(self, lines):
+
+        # Yields (offset, timestamp, level, raw bytes) for every record in a stream of lines
+        record = None
+
+        for offset, line in lines:
+
+            if line.startswith(b"{"):
+
+                if record is not None:
+                    yield record
+                    record = None
+
+                parsed = self.parse_json(offset, line)
+
+                if parsed is not None:
+                    yield parsed
+                    continue
+
+            plain = HandleSearch.ANSI_PATTERN.sub(b"", line).rstrip(b"\r\n")
+            header = HandleSearch.HEADER_PATTERN.match(plain)
+            timestamp = self.parse_timestamp(header.group(1)) if header else None
+
+            if timestamp is not None:
+
+                if record is not None:
+                    yield record
+
+                record = [offset, timestamp, None, [line]]
+                continue
+
+            level = HandleSearch.LEVEL_PATTERN.match(plain)
+
+            if level is not None and (record is None or record[2] is not None):
+
+                if record is not None:
+                    yield record
+
+                record = [offset, None, None, []]
+
+            if record is None:
+                record = [offset, None, None, []]
+
+            if level is not None and record[2] is None:
+                record[2] = level.group(1).decode('ascii')
+
+            record[3].append(line)
+
+        if record is not None:
+            yield record
+
+    @staticmethod
+    def parse_json(offset, line):
+
+        try:
+
+            entry = json.loads(line)
+
+        except ValueError:
+
+            return None
+
+        if not isinstance(entry, dict):
+            return None
+
+        return [offset, entry.get("timestamp"), entry.get("level"), [line]]
+
+    def parse_timestamp(self, text):
+
+        try:
+
+            return datetime.strptime(text.decode('utf-8'), self.timestamp_format).timestamp()
+
+        except (ValueError, UnicodeDecodeError):
+
+            return None
+
+    def matches(self, record):
+
+        _, timestamp, level, lines = record
+
+        if self.levels is not None and level not in self.levels:
+            return False
+
+        if self.since is not None or self.until is not None:
+
+            if timestamp is None:
+                return False
+
+            if self.since is not None and timestamp < self.since:
+                return False
+
+            if self.until is not None and timestamp > self.until:
+                return False
+
+        if self.contains is not None and not any(self.contains in line for line in lines):
+            return False
+
+        return True
+
+    def search(self, log_path, include_archives=True):
+
+        for path in self.log_files(log_path, include_archives):
+
+            start, end = 0, None
+
+            # The sidecar index narrows a time window down to a byte range before anything is parsed
+            if self.since is not None or self.until is not None:
+                start, end = HandleIndex.find_range(path, self.since, self.until)
+
+            for record in self.iter_records(HandleSearch.iter_lines(path, start, end)):
+
+                if self.matches(record):
+                    yield record
+
+    def follow(self, log_path, lines=10, poll_interval=0.5):
+
+        # Like tail -f: starts near the end, and picks up the new file after a rotation
+        log_file, identity = self.open_for_follow(log_path)
+        pending, chunk = b"", self.tail_start(log_file, lines)
+
+        try:
+
+            while True:
+
+                if chunk:
+
+                    pending += chunk
+                    complete, _, pending = pending.rpartition(b"\n")
+
+                    if complete:
+                        yield from self.emit(complete + b"\n", final=False)
+
+                    chunk = log_file.read()
+                    continue
+
+                yield from self.emit(b"", final=True)
+
+                if self.has_rotated(log_path, identity, log_file.tell()):
+                    log_file.close()
+                    log_file, identity = self.open_for_follow(log_path, wait=True)
+                    pending = b""
+                else:
+                    time.sleep(poll_interval)
+
+                chunk = log_file.read()
+
+        finally:
+            log_file.close()
+
+    def emit(self, data, final):
+
+        # Records are held back until the next one starts, or until the file goes quiet
+        lines = self._follow_lines + data.splitlines(keepends=True)
+        records = list(self.iter_records(enumerate(lines)))
+
+        if records and not final:
+            self._follow_lines = records[-1][3]
+            records = records[:-1]
+        else:
+            self._follow_lines = []
+
+        for record in records:
+
+            if self.matches(record):
+                yield record
+
+    def open_for_follow(self, log_path, wait=False):
+
+        while True:
+
+            try:
+
+                log_file = open(log_path, 'rb')
+                break
+
+            except FileNotFoundError:
+
+                if not wait:
+                    raise
+
+                time.sleep(0.1)
+
+        stat = os.fstat(log_file.fileno())
+        self._follow_lines = []
+
+        return log_file, (stat.st_dev, stat.st_ino)
+
+    @staticmethod
+    def has_rotated(log_path, identity, position):
+
+        try:
+
+            stat = os.stat(log_path)
+
+        except FileNotFoundError:
+
+            return False
+
+        return (stat.st_dev, stat.st_ino) != identity or stat.st_size < position
+
+    @staticmethod
+    def tail_start(log_file, lines):
+
+        # Seeks back far enough to show roughly the last few lines
+        size = log_file.seek(0, os.SEEK_END)
+        position, newlines = size, 0
+
+        while position > 0 and newlines <= lines:
+
+            step = min(8192, position)
+            position -= step
+            log_file.seek(position)
+            newlines += log_file.read(step).count(b"\n")
+
+        log_file.seek(position)
+        data = log_file.read()
+        kept = data.split(b"\n")[-(lines + 1):] if lines else [b""]
+
+        log_file.seek(size)
+
+        return b"\n".join(kept)
+
+
+def parse_time(text):
+
+    return datetime.fromisoformat(text).timestamp()
+
+
+def build_parser():
+
+    parser = argparse.ArgumentParser(prog="logger-cli", description="Search and follow pylgx log files.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    search = subparsers.add_parser("search", help="Search the log and its archives.")
+    tail = subparsers.add_parser("tail", help="Print the end of the log and optionally follow it.")
+
+    for subparser in (search, tail):
+
+        subparser.add_argument("log_path", help="Path to the live log file.")
+        subparser.add_argument("--level", action="append", help="Only show records at this level. Repeatable.")
+        subparser.add_argument("--contains", help="Only show records containing this text.")
+        subparser.add_argument("--timestamp-format", help="strftime format used by the text log.")
+        subparser.add_argument("--config", help="Logger JSON config to read the timestamp format from.")
+
+    search.add_argument("--since", type=parse_time, help="ISO date/time; skip older records.")
+    search.add_argument("--until", type=parse_time, help="ISO date/time; skip newer records.")
+    search.add_argument("--no-archives", action="store_true", help="Only search the live log.")
+
+    tail.add_argument("-n", "--lines", type=int, default=10, help="Lines to show before following.")
+    tail.add_argument("-f", "--follow", action="store_true", help="Keep printing new records, across rotations.")
+
+    return parser
+
+
+def load_timestamp_format(arguments):
+
+    if arguments.timestamp_format:
+        return arguments.timestamp_format
+
+    if arguments.config:
+
+        with open(arguments.config, 'r') as config:
+            return json.load(config).get("log_components", {}).get("timestamp_format")
+
+    return None
+
+
+def main(argv=None):
+
+    arguments = build_parser().parse_args(argv)
+    output = sys.stdout.buffer
+
+    searcher = HandleSearch(
+        levels=arguments.level,
+        since=getattr(arguments, "since", None),
+        until=getattr(arguments, "until", None),
+        contains=arguments.contains,
+        timestamp_format=load_timestamp_format(arguments))
+
+    if arguments.command == "search":
+        records = searcher.search(arguments.log_path, include_archives=not arguments.no_archives)
+
+    elif arguments.follow:
+        records = searcher.follow(arguments.log_path, arguments.lines)
+
+    else:
+        with open(arguments.log_path, 'rb') as log_file:
+            tail = searcher.tail_start(log_file, arguments.lines)
+        records = searcher.iter_records(enumerate(tail.splitlines(keepends=True)))
+        records = (record for record in records if searcher.matches(record))
+
+    following = arguments.command == "tail" and arguments.follow
+
+    try:
+
+        for record in records:
+
+            output.write(b"".join(record[3]))
+
+            if following:
+                output.flush()
+
+    except (KeyboardInterrupt, BrokenPipeError):
+
+        return 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,6 +2,7 @@ from .output_handler import HandleOutput
 import os
 import json
 import sys
+import threading
 
 
 class HandleConfigs:
@@ -12,37 +13,44 @@ class HandleConfigs:
         "timestamp": True,
         "timestamp_format": "%Y-%m-%d / %Hh-%Mm-%Ss",
         "message": True,
-        "level": True
+        "level": True,
+        "output_format": "text"
     },
     "error_map": {
         "INFO": {
             "color": "\\033[0;34m",
             "level": "INFO",
+            "severity": 20,
             "traceback": False
         },
         "DEBUG": {
             "color": "\\033[0;35m",
             "level": "DEBUG",
+            "severity": 10,
             "traceback": True
         },
         "ERROR": {
             "color": "\\033[0;31m",
             "level": "ERROR",
+            "severity": 40,
             "traceback": False
         },
         "WARNING": {
             "color": "\\033[1;33m",
             "level": "WARNING",
+            "severity": 30,
             "traceback": True
         },
         "CRITICAL": {
             "color": "\\033[1;35m",
             "level": "CRITICAL",
+            "severity": 50,
             "traceback": True
         },
         "DEFAULT" : {
             "color": "\033[1;33m",
             "level": "DEFAULT",
+            "severity": 20,
             "traceback": True
         }
     },
@@ -55,33 +63,155 @@ class HandleConfigs:
         "max_file_size": 10,
         "time_rotation": False,
         "max_file_age": 1,
-        "check_interval": 30
+        "check_interval": 30,
+        "compression": "gzip",
+        "compression_workers": 1,
+        "max_archives": 0,
+        "max_archive_bytes": 0,
+        "max_archive_age": 0
     },
 
     "batch_logging_configs" : {
         "batch_logging": True,
         "batch_size": 10,
         "flush_interval": 45,
-        "check_interval": 10
+        "check_interval": 10,
+        "buffer_size": 65536
+    },
+
+    "index_configs": {
+        "index": True,
+        "every_records": 1000,
+        "every_bytes": 65536
+    },
+
+    "queue_configs": {
+        "capacity": 10000,
+        "overflow_policy": "block",
+        "block_timeout": 0.5,
+        "threshold_level": "WARNING"
+    },
+
+    "traceback_configs": {
+        "cache": True,
+        "cache_size": 256,
+        "max_depth": 0,
+        "chain": True,
+        "max_chain": 0,
+        "render": "writer"
+    },
+
+    "suppression_configs": {
+        "dedup": False,
+        "dedup_window": 10.0,
+        "rate_limit": False,
+        "rate": 10.0,
+        "burst": 50,
+        "max_fingerprints": 1024,
+        "summary_interval": 10.0
+    },
+
+    "durability_configs": {
+        "mode": "flush",
+        "fsync_interval": 1.0,
+        "fsync_level": "ERROR",
+        "wait_for_durable": False,
+        "wait_level": "CRITICAL",
+        "wait_timeout": 5.0
+    },
+
+    "flight_recorder_configs": {
+        "flight_recorder": False,
+        "capacity": 10000,
+        "record_below": "WARNING",
+        "trigger_level": "ERROR",
+        "dump_on_exit": True
     },
 
     "output_configs": {
         "terminal": True,
-        "file": True
+        "file": True,
+        "min_level": "DEBUG",
+        "deferred_formatting": True,
+        "verbose_internal": False,
+        "internal_message_limit": 1000,
+        "sinks": {
+            "terminal": {"min_level": "DEBUG", "overflow_policy": "drop_oldest"},
+            "file": {"min_level": "DEBUG"}
+        }
     }
 }
 
+    # Shared by every HandleConfigs: the schema is compiled from the fallback once, and validated
+    # configs are kept per file so later Logger instances skip the read and the validation
+    _schema = None
+    _validated = {}
+    _cache_lock = threading.Lock()
+
     def __init__(self, config_path):
 
-        if config_path is None:
-            config_path = os.path.join(os.path.dirname(
-                __file__), 'Logger_primary_config.JSON')
+        config_path = HandleConfigs.resolve_path(config_path)
 
         HandleOutput.log_internal_message(
             f"Attempting to load configs from {config_path}")
         self.configs = self.get_config_map(config_path)
         HandleOutput.log_internal_message("Initialising configuration file")
 
+    @classmethod
+    def load(cls, config_path=None):
+
+        config_path = cls.resolve_path(config_path)
+        key = cls.cache_key(config_path)
+
+        with cls._cache_lock:
+            cached = cls._validated.get(key) if key is not None else None
+
+        if cached is None:
+
+            cached = cls(config_path).get_valid_config()
+
+            if key is not None:
+                with cls._cache_lock:
+                    cls._validated[key] = cached
+
+        # Every caller gets its own copy, so nothing it changes leaks into the cache
+        return HandleConfigs.copy_config(cached)
+
+    @staticmethod
+    def copy_config(value):
+
+        # Configs are plain JSON objects; this is several times cheaper than copy.deepcopy
+        if isinstance(value, dict):
+            return {key: HandleConfigs.copy_config(item) for key, item in value.items()}
+
+        if isinstance(value, list):
+            return [HandleConfigs.copy_config(item) for item in value]
+
+        return value
+
+    @staticmethod
+    def resolve_path(config_path):
+
+        if config_path is None:
+            config_path = os.path.join(os.path.dirname(
+                __file__), 'Logger_primary_config.JSON')
+
+        return os.path.abspath(config_path)
+
+    @staticmethod
+    def cache_key(config_path):
+
+        # An edited file gets a new key, so changes are picked up by the next Logger
+        try:
+
+            stat = os.stat(config_path)
+
+        except OSError:
+
+            return None
+
+        return config_path, stat.st_mtime_ns, stat.st_size
+
     def get_valid_config(self):
 
         self.validate_config_types(self.configs)
@@ -107,7 +237,23 @@ class HandleConfigs:
                 json.dump(HandleConfigs.FALLBACK_CONFIGURATION,
                           config_file, indent=4)
 
-            return HandleConfigs.FALLBACK_CONFIGURATION
+            return HandleConfigs.copy_config(HandleConfigs.FALLBACK_CONFIGURATION)
+
+    @staticmethod
+    def get_schema():
+
+        # section -> (expected type, {key -> (type to enforce or None, default)}), built once per process
+        if HandleConfigs._schema is None:
+
+            HandleConfigs._schema = {
+                key: (type(default), {
+                    subkey: (dict if isinstance(subdefault, dict) else None, subdefault)
+                    for subkey, subdefault in default.items()
+                } if isinstance(default, dict) else None)
+                for key, default in HandleConfigs.FALLBACK_CONFIGURATION.items()
+            }
+
+        return HandleConfigs._schema
 
     def validate_config_types(self, configs=None):
 
@@ -115,44 +261,54 @@ class HandleConfigs:
             configs = self.configs
 
         FALLBACK = HandleConfigs.FALLBACK_CONFIGURATION
+        schema = HandleConfigs.get_schema()
 
-        for key, value in configs.items():
+        unknown_keys = not configs.keys() <= schema.keys() or any(
+            fields is not None and isinstance(configs.get(key), dict) and not configs[key].keys() <= fields.keys()
+            for key, (_, fields) in schema.items())
 
-            if key not in FALLBACK:
-                HandleOutput.log_internal_message(
-                    "Specified config uses malformed or corrupted data. Using Fallback")
-                self.configs = FALLBACK
-                return
+        if unknown_keys:
+            HandleOutput.log_internal_message(
+                "Specified config uses malformed or corrupted data. Using Fallback")
+            self.configs = HandleConfigs.copy_config(FALLBACK)
+            return
+
+        for key, (expected_type, fields) in schema.items():
+
+            if key not in configs:
+                configs[key] = HandleConfigs.copy_config(FALLBACK[key])
+                continue
 
-            fallback = FALLBACK[key]
+            value = configs[key]
 
-            if isinstance(value, dict) and isinstance(fallback, dict):
+            if not isinstance(value, expected_type):
+                HandleOutput.log_internal_message(
+                    f"Encountered TypeError. Expected {expected_type} but found {type(value)}")
+                configs[key] = HandleConfigs.copy_config(FALLBACK[key])
+                continue
 
-                for subkey, subvalue in value.items():
+            if fields is None:
+                continue
 
-                    if subkey not in fallback:
-                        HandleOutput.log_internal_message(
-                            "Specified config uses malformed or corrupted data. Using Fallback")
-                        self.configs = FALLBACK
-                        return
+            for subkey, (subtype, subdefault) in fields.items():
 
-                    subfallback = FALLBACK[key][subkey]
+                if subkey not in value:
+                    value[subkey] = HandleConfigs.copy_config(subdefault)
+                    continue
 
-                    if isinstance(fallback[subkey], dict):
+                if subtype is None:
+                    continue
 
-                        if not isinstance(subvalue, type(subfallback)):
-                            HandleOutput.log_internal_message(
-                                f"Encountered TypeError. Expected {type(subfallback)} but found {type(subvalue)}")
-                            configs[key][subkey] = subfallback
-                            continue
+                subvalue = value[subkey]
 
-                continue
+                if not isinstance(subvalue, subtype):
+                    HandleOutput.log_internal_message(
+                        f"Encountered TypeError. Expected {subtype} but found {type(subvalue)}")
+                    value[subkey] = HandleConfigs.copy_config(subdefault)
+                    continue
 
-            if not isinstance(value, type(fallback)):
-                HandleOutput.log_internal_message(
-                    f"Encountered TypeError. Expected {type(fallback)} but found {type(value)}")
-                configs[key] = fallback
-                continue
+                for field, default in subdefault.items():
+                    subvalue.setdefault(field, default)
 
     def validate_log_path(self):
 
@@ -0,0 +1,57 @@
+from .internal_handler import HandleInternalMessages
+import time
+
+
+class HandleDurability:
+
+    # none: left in the writer's buffer until it fills, flush: handed to the OS every batch,
+    # fsync_*: also synced to disk, after every batch, at most every fsync_interval, or only for records >= fsync_level
+    MODES = ("none", "flush", "fsync_batch", "fsync_interval", "fsync_level")
+
+    def __init__(self, durability_config, writer, get_severity):
+
+        self.mode = durability_config["mode"]
+        if self.mode not in HandleDurability.MODES:
+            HandleInternalMessages.log_internal_message(f"Unknown durability mode '{self.mode}'. Using 'flush'")
+            self.mode = "flush"
+
+        self.writer = writer
+        self.get_severity = get_severity
+
+        self.flush_writes = self.mode != "none"
+        self.sync_interval = durability_config["fsync_interval"] # seconds
+        self.sync_severity = get_severity(durability_config["fsync_level"])
+
+        writer.sync_on_close = self.mode.startswith("fsync")
+
+        self.next_sync = time.monotonic() + self.sync_interval
+
+    def requires_sync(self, records):
+
+        mode = self.mode
+
+        if mode == "fsync_batch":
+            return self.writer.unsynced
+
+        if mode == "fsync_interval":
+            return self.writer.unsynced and time.monotonic() >= self.next_sync
+
+        if mode == "fsync_level":
+            get_severity = self.get_severity
+            sync_severity = self.sync_severity
+            return any(get_severity(record.level) >= sync_severity for record in records)
+
+        return False
+
+    def time_until_sync(self):
+
+        # Only the interval mode has a deadline to wake up for, and only with something left to sync
+        if self.mode != "fsync_interval" or not self.writer.unsynced:
+            return None
+
+        return max(0.0, self.next_sync - time.monotonic())
+
+    def sync(self):
+
+        self.writer.sync()
+        self.next_sync = time.monotonic() + self.sync_interval
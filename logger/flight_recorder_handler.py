@@ -0,0 +1,115 @@
+from .log_record import LogRecord
+import itertools
+import threading
+import time
+
+
+class HandleFlightRecorder:
+
+    def __init__(self, recorder_config, log_queue, get_severity):
+
+        self.capacity = max(1, recorder_config["capacity"])
+        self.record_below = get_severity(recorder_config["record_below"]) # held in the ring, not written
+        self.trigger_severity = get_severity(recorder_config["trigger_level"]) # dumps the ring ahead of itself
+        self.dump_on_exit = recorder_config["dump_on_exit"]
+
+        self.log_queue = log_queue
+
+        # Allocated up front. Recording takes no lock: each record draws a sequence number, which is
+        # atomic, and writes one tuple into its slot; a dump keeps only the slots whose number it expects
+        self._slots = [None] * self.capacity
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+
+        # Numbers drawn by dumps and snapshots to read the counter; they never name a record
+        self._reserved = 0
+        self._dumped_until = 0
+        self._captured_at_dump = 0
+
+        self.dumped = 0
+        self.dumps = 0
+
+    def record(self, level, message, args, exception, extra):
+
+        sequence = next(self._sequence)
+        self._slots[sequence % self.capacity] = (sequence, time.time(), level, message, args, exception, extra)
+
+    def _read_sequence(self):
+
+        # Returns the next unused number and how many records have been captured before it
+        end = next(self._sequence)
+        captured = end - self._reserved
+        self._reserved += 1
+
+        return end, captured
+
+    def take(self):
+
+        # Oldest first; only the slots written since the last dump are visited and released
+        with self._lock:
+
+            end, captured = self._read_sequence()
+            start = max(self._dumped_until, end - self.capacity)
+            self._dumped_until = end + 1
+            self._captured_at_dump = captured
+
+            slots = self._slots
+            entries = []
+
+            for sequence in range(start, end):
+
+                index = sequence % self.capacity
+                entry = slots[index]
+
+                # A slot already reused by a newer record, or not written yet by a racing caller, is skipped
+                if entry is not None and entry[0] == sequence:
+                    entries.append(entry)
+                    slots[index] = None
+
+            if entries:
+                self.dumped += len(entries)
+                self.dumps += 1
+
+        return entries
+
+    def take_records(self, reason):
+
+        entries = self.take()
+
+        if not entries:
+            return []
+
+        records = [LogRecord(level, message, args, exception, created, extra)
+                   for _, created, level, message, args, exception, extra in entries]
+
+        # The header reads before the dumped records and says why they were written at all
+        header = LogRecord(
+            "INFO", "Flight recorder: %d buffered records from the last %.1fs follow (%s)",
+            (len(records), time.time() - records[0].created, reason), created=records[0].created)
+
+        return [header, *records]
+
+    def dump(self, reason):
+
+        records = self.take_records(reason)
+
+        if records:
+            self.log_queue.put_many(records)
+
+        return max(0, len(records) - 1)
+
+    def snapshot(self):
+
+        with self._lock:
+
+            _, captured = self._read_sequence()
+            buffered = min(captured - self._captured_at_dump, self.capacity)
+
+            return {
+                "capacity": self.capacity,
+                "buffered": buffered,
+                "captured": captured,
+                "dumped": self.dumped,
+                "dumps": self.dumps,
+                "overwritten": captured - self.dumped - buffered
+            }
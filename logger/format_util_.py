@@ -1,6 +1,5 @@
 from datetime import datetime
-from output_handler import HandleOutput
-import traceback
+from .output_handler import HandleOutput
 
 
 class FormatComponents:
@@ -13,18 +12,43 @@ class FormatComponents:
         # how JSON files store ANSI escape sequences
 
     @staticmethod
-    def get_timestamp(log_components):
+    def get_timestamp(log_components, created=None):
 
-        return f"[{datetime.now().strftime(log_components.get('timestamp_format', r'%y_%m_%d %H_%M_%S'))}]\n"
+        moment = datetime.now() if created is None else datetime.fromtimestamp(created)
+
+        return f"[{moment.strftime(log_components.get('timestamp_format', r'%y_%m_%d %H_%M_%S'))}]\n"
+
+    @staticmethod
+    def get_traceback(error, tracebacks=None):
+
+        traceback_text = FormatComponents.get_traceback_text(error, tracebacks)
+
+        return "\n\033[0m" + traceback_text if traceback_text else ""
+
+    @staticmethod
+    def get_exception_type(error):
+
+        if isinstance(error, BaseException):
+            return type(error).__name__
+
+        if isinstance(error, type) and issubclass(error, BaseException):
+            return error.__name__
+
+        return None
 
     @staticmethod
-    def get_traceback(error):
+    def get_traceback_text(error, tracebacks=None):
 
         if error is None:
 
             HandleOutput.log_internal_message("No error was provided")
             return ""
 
+        if isinstance(error, str):
+
+            # Already rendered by another process
+            return error
+
         if not isinstance(error, Exception):
             if callable(error):
 
@@ -36,6 +60,12 @@ class FormatComponents:
 
         if not hasattr(error, '__traceback__'):
 
-            return "\nNo traceback provided"
+            return "No traceback provided"
+
+        if tracebacks is not None:
+            return tracebacks.format(error)
+
+        # traceback pulls in linecache and tokenize, so it's only imported once a traceback is rendered
+        import traceback
 
-        return "\n\033[0m" + ''.join(traceback.format_exception(None, error, error.__traceback__))
+        return ''.join(traceback.format_exception(None, error, error.__traceback__))
@@ -0,0 +1,165 @@
+from bisect import bisect_right
+import os
+
+
+class HandleIndex:
+
+    EXTENSION = ".idx"
+
+    def __init__(self, file, index_config):
+
+        self.file_path = file
+        self.index_path = file + HandleIndex.EXTENSION
+
+        self.every_records = index_config["every_records"]
+        self.every_bytes = index_config["every_bytes"]
+
+        self._pending = []
+        self._fd = None
+        self.open()
+
+    def open(self):
+
+        self._fd = os.open(self.index_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self.discard_stale_entries()
+
+        # The first record written after opening always gets an entry
+        self.records_since = self.every_records
+        self.bytes_since = self.every_bytes
+
+    def discard_stale_entries(self):
+
+        # An index pointing past the end of its log belongs to a file that was replaced underneath it
+        try:
+
+            log_size = os.path.getsize(self.file_path)
+
+        except FileNotFoundError:
+
+            log_size = 0
+
+        entries = HandleIndex.read_entries(self.index_path)
+
+        if entries and entries[-1][1] > log_size:
+            os.ftruncate(self._fd, 0)
+            entries = []
+
+        self.last_created = entries[-1][0] if entries else 0.0
+
+    def note(self, created, offset, size):
+
+        # Called for every record written, so an entry lands as soon as either threshold is crossed
+        if self.records_since >= self.every_records or self.bytes_since >= self.every_bytes:
+
+            # Entries must stay sorted for find_range's bisect, but a batch can start with records older
+            # than ones already written (a flight recorder dump, a slow producer), so times never go back
+            created = self.last_created = max(created, self.last_created)
+
+            self._pending.append(f"{created:.6f} {offset}\n")
+            self.records_since = 0
+            self.bytes_since = 0
+
+        self.records_since += 1
+        self.bytes_since += size
+
+    def flush(self):
+
+        # Called once the log bytes are on disk, so entries never point at unwritten data
+        if self._pending and self._fd is not None:
+
+            os.write(self._fd, ''.join(self._pending).encode('ascii'))
+            self._pending.clear()
+
+    def close(self):
+
+        self.flush()
+
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def rotate(self, archive_path):
+
+        self.close()
+
+        try:
+
+            if os.path.exists(self.index_path):
+                os.replace(self.index_path, archive_path + HandleIndex.EXTENSION)
+
+        finally:
+            # Whatever happened to the old sidecar, the log being written next needs one
+            self.open()
+
+    @staticmethod
+    def read_entries(index_path):
+
+        entries = []
+
+        try:
+
+            with open(index_path, 'r', encoding='ascii') as index_file:
+
+                for line in index_file:
+
+                    try:
+
+                        created, offset = line.split()
+                        entries.append((float(created), int(offset)))
+
+                    except ValueError:
+
+                        continue
+
+        except FileNotFoundError:
+
+            pass
+
+        return entries
+
+    @staticmethod
+    def index_path_for(log_path):
+
+        # Compressed archives keep the sidecar of the uncompressed file; offsets are into the decompressed data
+        for extension in (".gz", ".xz"):
+
+            if log_path.endswith(extension):
+                log_path = log_path[:-len(extension)]
+
+        return log_path + HandleIndex.EXTENSION
+
+    @staticmethod
+    def find_range(log_path, since=None, until=None):
+
+        # Returns (start, end) byte offsets bounding the window; end is None for "to the end of the file"
+        entries = HandleIndex.read_entries(HandleIndex.index_path_for(log_path))
+
+        if not entries:
+            return 0, None
+
+        times = [created for created, _ in entries]
+        start, end = 0, None
+
+        if since is not None:
+
+            # Step back one entry: records in a batch can be slightly older than its first record
+            position = bisect_right(times, since) - 2
+            start = entries[position][1] if position >= 0 else 0
+
+        if until is not None:
+
+            position = bisect_right(times, until) + 1
+            end = entries[position][1] if position < len(entries) else None
+
+        return start, end
+
+    @staticmethod
+    def read_window(log_path, since=None, until=None):
+
+        start, end = HandleIndex.find_range(log_path, since, until)
+
+        with open(log_path, 'rb') as log_file:
+
+            log_file.seek(start)
+
+            return log_file.read() if end is None else log_file.read(max(0, end - start))
@@ -0,0 +1,40 @@
+from collections import deque
+import sys
+import time
+
+
+class HandleInternalMessages:
+
+    # Diagnostics are kept in memory rather than printed; verbose mode echoes them to stderr.
+    # This module imports nothing from the package, so any handler can report through it
+    internal_messages = deque(maxlen=1000)
+    verbose = False
+
+    @staticmethod
+    def log_internal_message(message, exception_traceback=None):
+
+        details = None
+
+        if exception_traceback:
+            import traceback
+            details = ''.join(traceback.format_exception(
+                None, exception_traceback, exception_traceback.__traceback__))
+
+        HandleInternalMessages.internal_messages.append((time.time(), message, details))
+
+        # Failures are always surfaced; routine chatter only in verbose mode
+        if HandleInternalMessages.verbose or details:
+
+            print(f"\033[1;37m[INTERNAL] {message}\033[0m", file=sys.stderr)
+
+            if details:
+                print(details, end='', file=sys.stderr)
+
+    @staticmethod
+    def configure_internal_messages(verbose, limit):
+
+        HandleInternalMessages.verbose = verbose
+
+        if limit != HandleInternalMessages.internal_messages.maxlen:
+            HandleInternalMessages.internal_messages = deque(
+                HandleInternalMessages.internal_messages, maxlen=max(1, limit))
@@ -1,28 +1,172 @@
-from format_util_ import FormatComponents
+from .format_util_ import FormatComponents
+from .log_record import LogRecord
+from .output_handler import HandleOutput
+from .traceback_handler import HandleTracebacks
+from json.encoder import encode_basestring
+import json
+import time
 
 class CompileLog:
 
-    def __init__(self, error_map, log_components):
+    RESET = "\033[0m"
+    JSON_FIELDS = frozenset(("level", "timestamp", "message", "exception_type", "traceback"))
+
+    def __init__(self, error_map, log_components, traceback_config=None):
 
         self.error_map = error_map
+        self.log_components = log_components
         self.color = log_components["color"]
         self.timestamp = log_components["timestamp"]
         self.level = log_components["level"]
         self.message = log_components["message"]
 
-    def build_log(self, message, error_level="DEFAULT", exception_traceback=None):
-            
-            error_level_info = self.error_map.get(error_level, self.error_map["DEFAULT"])
+        self.output_format = log_components["output_format"]
+        if self.output_format not in ("text", "json"):
+            HandleOutput.log_internal_message(
+                f"Unknown output format '{self.output_format}'. Using 'text'")
+            self.output_format = "text"
+
+        self.tracebacks = HandleTracebacks(traceback_config) if traceback_config else None
+
+        self._json_encoder = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False, default=str)
+
+        # Exception types a record has already failed to render with; each is reported in full once
+        self._render_failures = set()
+
+        # Sub-second formats change on every call, so only whole-second formats are cached
+        self._cache_timestamp = "%f" not in log_components.get("timestamp_format", "")
+        self._timestamp_cache = (None, "")
+
+        self.templates = {
+            error_level: self.compile_template(error_level) for error_level in error_map
+        }
+
+        self.default_severity = error_map["DEFAULT"]["severity"]
+        self.severities = {
+            error_level: level_info["severity"] for error_level, level_info in error_map.items()
+        }
+
+    def compile_template(self, error_level):
+
+        level_key = error_level if error_level in self.error_map else "DEFAULT"
+
+        return (
+            FormatComponents.get_color(self.error_map, level_key) if self.color else "",
+            f"[{error_level}] " if self.level else "",
+            CompileLog.RESET if self.color else "",
+            self.error_map[level_key]["traceback"]
+        )
+
+    def get_template(self, error_level):
+
+        template = self.templates.get(error_level)
+
+        # Levels outside error_map render with DEFAULT's settings; their template is kept like any other
+        if template is None:
+            template = self.templates[error_level] = self.compile_template(error_level)
+
+        return template
+
+    def get_severity(self, error_level):
+
+        return self.severities.get(error_level, self.default_severity)
+
+    def get_timestamp(self, created=None):
+
+        now = time.time() if created is None else created
+        second = int(now)
+        cached_second, cached_timestamp = self._timestamp_cache
+
+        if self._cache_timestamp and cached_second == second:
+            return cached_timestamp
+
+        timestamp = FormatComponents.get_timestamp(self.log_components, now)
+        self._timestamp_cache = (second, timestamp)
+
+        return timestamp
+
+    def render(self, record):
+
+        if record.text is None:
+
+            try:
+
+                if self.output_format == "json":
+                    record.text = self.build_json(record)
+                else:
+                    record.text = self.build_log(
+                        record.get_message(), record.level, record.exception, record.created)
 
-            final_log = [
-                FormatComponents.get_color(
-                    self.error_map, error_level_info) if self.color else "",
-                FormatComponents.get_timestamp(
-                    self.log_components) if self.timestamp else "",
-                f"[{error_level}] " if self.level else "",
+            except Exception as error:
+
+                # Rendering runs user __str__/__repr__ on the output thread; one that raises costs its record, not the thread
+                record.text = self.render_failure(record, error)
+
+        return record.text
+
+    def render_failure(self, record, error):
+
+        first = type(error) not in self._render_failures
+        self._render_failures.add(type(error))
+
+        HandleOutput.log_internal_message(
+            f"Couldn't render a record logged at {record.level}: {type(error).__name__}",
+            exception_traceback=error if first else None)
+
+        return self.render(LogRecord(
+            record.level, "%s [couldn't render this record: %s]",
+            (CompileLog.safe_repr(record.message), type(error).__name__), created=record.created))
+
+    @staticmethod
+    def safe_repr(value):
+
+        try:
+
+            return repr(value)
+
+        except Exception:
+
+            return object.__repr__(value)
+
+    def build_json(self, record):
+
+        template = self.get_template(record.level)
+
+        exception = record.exception
+        exception_type = FormatComponents.get_exception_type(exception) if exception else None
+        traceback_text = FormatComponents.get_traceback_text(exception, self.tracebacks) if template[3] and exception else None
+
+        # The fixed fields are spliced by hand; the generic encoder is several times slower for them
+        fields = ''.join((
+            '{"level":', encode_basestring(record.level),
+            ',"timestamp":', repr(record.created),
+            ',"message":', encode_basestring(str(record.get_message())),
+            ',"exception_type":', encode_basestring(exception_type) if exception_type else 'null',
+            ',"traceback":', encode_basestring(traceback_text) if traceback_text else 'null'
+        ))
+
+        extra = record.extra
+
+        if not extra:
+            return fields + '}'
+
+        if not CompileLog.JSON_FIELDS.isdisjoint(extra):
+            extra = {key: value for key, value in extra.items() if key not in CompileLog.JSON_FIELDS}
+
+        extra_fields = self._json_encoder.encode(extra)
+
+        return f"{fields},{extra_fields[1:]}" if len(extra_fields) > 2 else fields + '}'
+
+    def build_log(self, message, error_level="DEFAULT", exception_traceback=None, created=None):
+
+            color, level_tag, reset, with_traceback = self.get_template(error_level)
+
+            return ''.join((
+                color,
+                self.get_timestamp(created) if self.timestamp else "",
+                level_tag,
                 f"{message}" if self.message else "",
                 FormatComponents.get_traceback(
-                    exception_traceback) if error_level_info["traceback"] and exception_traceback else ""
-            ]
-
-            return ''.join(final_log)
\ No newline at end of file
+                    exception_traceback, self.tracebacks) if with_traceback and exception_traceback else "",
+                reset
+            ))
@@ -0,0 +1,32 @@
+import time
+
+
+class LogRecord:
+
+    __slots__ = ("level", "message", "args", "exception", "created", "extra", "text")
+
+    def __init__(self, level, message, args=None, exception=None, created=None, extra=None, text=None):
+
+        self.level = level
+        self.message = message
+        self.args = args
+        self.exception = exception
+
+        # Wall-clock time, read per record, so a clock step or a suspend never shifts what is shown or indexed
+        self.created = time.time() if created is None else created
+
+        self.extra = extra
+        self.text = text
+
+    def get_message(self):
+
+        if not self.args:
+            return self.message
+
+        try:
+
+            return self.message % self.args
+
+        except Exception:
+
+            return f"{self.message} {self.args!r}"
@@ -1,7 +1,11 @@
 from .config_handler import HandleConfigs
 from .log_compiler import CompileLog
 from .output_handler import HandleOutput
-from .bg_rotation import BgRotation
+from .internal_handler import HandleInternalMessages
+from .log_record import LogRecord
+from .stats_handler import HandleStats
+import sys
+import threading
 
 class Logger:
 
@@ -11,25 +15,160 @@ class Logger:
 
     def __init__(self, config_path=None):
 
-        self.configs = HandleConfigs(config_path).get_valid_config()
+        self.configs = HandleConfigs.load(config_path)
+
+        output_configs = self.configs["output_configs"]
+        HandleOutput.configure_internal_messages(
+            output_configs["verbose_internal"], output_configs["internal_message_limit"])
 
         if not Logger._compiler:
             Logger._compiler = CompileLog(
-                self.configs["error_map"], self.configs["log_components"])
+                self.configs["error_map"], self.configs["log_components"], self.configs["traceback_configs"])
         if not Logger._output:
-            Logger._output = HandleOutput(self.configs["output_configs"], self.configs["batch_logging_configs"], self.configs["file_locations"]["log_file_path"])
+            stats = HandleStats()
+            rotation = None
+
+            # Rotation brings in the archive pool and compression, so it's only imported when enabled
+            if self.configs["log_rotation_configs"]["log_rotation"]:
+                from .rotation_handler import HandleRotation
+                rotation = HandleRotation(self.configs, stats)
+
+            Logger._output = HandleOutput(self.configs["output_configs"], self.configs["batch_logging_configs"], self.configs["file_locations"]["log_file_path"], Logger._compiler, self.configs["queue_configs"], rotation, self.configs["index_configs"], stats, self.configs["suppression_configs"], self.configs["flight_recorder_configs"], self.configs["durability_configs"])
 
         self._compiler = Logger._compiler
         self._output = Logger._output
 
-        if self.configs["log_rotation_configs"]["log_rotation"]:
-            rotation_task = BgRotation(self.configs)
+        self._deferred = output_configs["deferred_formatting"]
+        self._severities = self._compiler.severities
+        self._default_severity = self._compiler.default_severity
+        self._min_severity = self._compiler.get_severity(output_configs["min_level"])
+        self._suppression = self._output.suppression
+        self._recorder = self._output.recorder
+
+        # Records at or above wait_level block the caller until they're fsynced, or wait_timeout passes
+        durability_configs = self.configs["durability_configs"]
+        self._wait_severity = self._compiler.get_severity(durability_configs["wait_level"]) \
+            if durability_configs["wait_for_durable"] else None
+        self._wait_timeout = durability_configs["wait_timeout"]
+        self._render_exceptions = self._compiler.tracebacks is not None and self._compiler.tracebacks.render_on_caller
+
+
+    def log(self, message, level, exception_traceback=None, args=None, extra=None):
+
+        admitted = self.admit(message, level, exception_traceback, args, extra)
+        if admitted is None:
+            return
+
+        severity, record, dumped = admitted
+
+        if dumped:
+            self._output.log_queue.put_many(dumped)
+
+        self._output.log_queue.put(record)
+
+        if self._wait_severity is not None and severity >= self._wait_severity:
+            self.flush(self._wait_timeout, durable=True)
+
+    def admit(self, message, level, exception_traceback=None, args=None, extra=None):
+
+        # Everything a record goes through before it is queued, shared by Logger.log and AsyncLogger.log.
+        # Returns None when the record goes no further, else (severity, record, flight recorder dump or None).
+        # Must be called straight from a log() method: suppression keys on the frame that called log()
+        severity = self._severities.get(level, self._default_severity)
+
+        # Filtered records are rejected before anything is allocated for them
+        if severity < self._min_severity:
+            return None
+
+        # Floods from one call site are counted here and never reach the queue or the formatter
+        if self._suppression is not None and not self._suppression.allow(
+                level, message, args, exception_traceback, sys._getframe(2)):
+            return None
+
+        recorder = self._recorder
+        dumped = None
+
+        if recorder is not None:
+
+            # Low-severity records only go into the ring; nothing is formatted or queued for them
+            if severity < recorder.record_below:
+                recorder.record(level, message, args, exception_traceback, extra)
+                return None
+
+            if severity >= recorder.trigger_severity:
+                dumped = recorder.take_records(f"triggered by {level}")
+
+        record = LogRecord(level, message, args, exception_traceback, extra=extra)
+
+        if not self._deferred:
+            self._compiler.render(record)
+
+        elif exception_traceback is not None and self._render_exceptions:
+            # Rendered now, so the traceback's frames and their locals are released straight away
+            self._compiler.render(record)
+            record.exception = None
+
+        return severity, record, dumped
+
+    def flush(self, timeout=None, durable=False):
+
+        # With durable, returns only once everything logged so far is on disk; concurrent callers share one fsync
+        flushed = threading.Event()
+        self._output.request_flush(flushed.set, durable)
+
+        return flushed.wait(timeout)
+
+    def stats(self):
+
+        stats = self._output.stats.snapshot()
+        stats["queue"] = self._output.log_queue.snapshot()
+        stats["sinks"] = {sink.name: sink.snapshot() for sink in self._output.sinks}
+
+        if self._suppression is not None:
+            stats["suppression"] = self._suppression.snapshot()
+
+        if self._recorder is not None:
+            stats["flight_recorder"] = self._recorder.snapshot()
+
+        return stats
+
+    def dump_flight_recorder(self):
+
+        # Writes out whatever the ring holds now; returns how many records that was
+        if self._recorder is None:
+            return 0
+
+        return self._recorder.dump("on demand")
+
+    @staticmethod
+    def internal_messages():
+
+        # (wall time, message, formatted traceback or None), oldest first
+        return list(HandleInternalMessages.internal_messages)
+
+_default_logger = None
+_default_lock = threading.Lock()
+
+
+def get_logger():
+
+    # The default logger is only built when first asked for, never as a side effect of importing
+    global _default_logger
+
+    if _default_logger is None:
+
+        with _default_lock:
+
+            if _default_logger is None:
+                _default_logger = Logger()
 
+    return _default_logger
 
-    def log(self, message, level, exception_traceback=None):
 
-        message = self._compiler.build_log(message, level, exception_traceback)
-        self._output.log_queue.put(message)
+def __getattr__(name):
 
-logx = Logger()
+    # Keeps `from logger.logger import logx` working without constructing anything at import
+    if name == "logx":
+        return get_logger()
 
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
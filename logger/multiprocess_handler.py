@@ -0,0 +1,193 @@
+from .config_handler import HandleConfigs
+from .log_record import LogRecord
+from .logger import Logger
+from .traceback_handler import HandleTracebacks
+import atexit
+import multiprocessing
+import multiprocessing.util
+import os
+import queue
+import threading
+import time
+import traceback
+import weakref
+
+
+class HandleMultiprocess:
+
+    def __init__(self, config_path=None, context=None, batch_size=64):
+
+        self.config_path = config_path
+        self.batch_size = batch_size
+
+        configs = HandleConfigs.load(config_path)
+        error_map = configs["error_map"]
+
+        self.severities = {
+            error_level: level_info["severity"] for error_level, level_info in error_map.items()
+        }
+        self.default_severity = error_map["DEFAULT"]["severity"]
+        self.min_severity = self.severities.get(
+            configs["output_configs"]["min_level"], self.default_severity)
+        self.traceback_config = configs["traceback_configs"]
+
+        self._context = multiprocessing.get_context(context)
+        self.record_queue = self._context.Queue()
+        self.process = None
+
+        # Loggers handed out here; the ones used in this process are flushed before the writer is stopped
+        self._loggers = weakref.WeakSet()
+
+    def start(self):
+
+        self.process = self._context.Process(
+            target=run_writer_process, args=(self.record_queue, self.config_path, self.batch_size),
+            name="logger-writer", daemon=True)
+        self.process.start()
+
+        return self
+
+    def get_logger(self):
+
+        process_logger = ProcessLogger(self.record_queue, self.severities, self.default_severity, self.min_severity,
+                                       traceback_config=self.traceback_config)
+        self._loggers.add(process_logger)
+
+        return process_logger
+
+    def stop(self, timeout=None):
+
+        if self.process is None:
+            return
+
+        # Batches still held in this process go ahead of the sentinel. Other processes flush when they
+        # exit, so workers should be joined (or call flush()) before stop()
+        for process_logger in list(self._loggers):
+            process_logger.flush()
+
+        self.record_queue.put(None)
+        self.process.join(timeout)
+        self.process = None
+
+
+class ProcessLogger:
+
+    def __init__(self, record_queue, severities, default_severity, min_severity,
+                 batch_size=256, flush_interval=0.1, traceback_config=None):
+
+        self.record_queue = record_queue
+        self.severities = severities
+        self.default_severity = default_severity
+        self.min_severity = min_severity
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.traceback_config = traceback_config
+
+        self._pid = None
+
+    def __getstate__(self):
+
+        # Locks, threads and pending records stay with the process that created them
+        state = self.__dict__.copy()
+        for key in ("_lock", "_pending", "_flusher", "_tracebacks"):
+            state.pop(key, None)
+        state["_pid"] = None
+
+        return state
+
+    def log(self, message, level, exception_traceback=None, args=None, extra=None):
+
+        if self.severities.get(level, self.default_severity) < self.min_severity:
+            return
+
+        if self._pid != os.getpid():
+            self._start_flusher()
+
+        record = LogRecord(level, message, args)
+
+        # Tracebacks can't be pickled, so they cross the process boundary as text
+        exception_text = None
+        if isinstance(exception_traceback, BaseException):
+
+            if self._tracebacks is not None:
+                exception_text = self._tracebacks.format(exception_traceback)
+            else:
+                exception_text = ''.join(traceback.format_exception(
+                    None, exception_traceback, exception_traceback.__traceback__))
+
+        with self._lock:
+
+            self._pending.append((level, record.get_message(), exception_text, record.created, extra))
+
+            if len(self._pending) >= self.batch_size:
+                self._ship()
+
+    def flush(self):
+
+        if self._pid == os.getpid():
+
+            with self._lock:
+                self._ship()
+
+    def _ship(self):
+
+        if self._pending:
+            self.record_queue.put(self._pending)
+            self._pending = []
+
+    def _start_flusher(self):
+
+        # Runs once per process, so a logger inherited through fork gets its own flusher
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._pending = []
+
+        # Each process keeps its own traceback cache; an error storm in a worker formats each trace once
+        self._tracebacks = HandleTracebacks(self.traceback_config) if self.traceback_config else None
+
+        self._flusher = threading.Thread(target=self._run_flusher, daemon=True)
+        self._flusher.start()
+
+        # multiprocessing children skip atexit; Finalize runs before the queue's own feeder is closed
+        multiprocessing.util.Finalize(self, self.flush, exitpriority=20)
+        atexit.register(self.flush)
+
+    def _run_flusher(self):
+
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+
+def run_writer_process(record_queue, config_path, batch_size):
+
+    # Anything inherited from the parent through fork belongs to the parent's writer thread
+    Logger._compiler = None
+    Logger._output = None
+
+    output = Logger(config_path)._output
+    running = True
+
+    while running:
+
+        batches = [record_queue.get()]
+
+        try:
+
+            while len(batches) < batch_size:
+                batches.append(record_queue.get_nowait())
+
+        except queue.Empty:
+            pass
+
+        if None in batches:
+            batches = batches[:batches.index(None)]
+            running = False
+
+        output.log_queue.put_many([
+            LogRecord(level, message, exception=exception_text, created=created, extra=extra)
+            for batch in batches
+            for level, message, exception_text, created, extra in batch
+        ])
+
+    output._flush_on_exit()
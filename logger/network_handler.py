@@ -0,0 +1,475 @@
+from .internal_handler import HandleInternalMessages
+from .batching_handler import HandleBatching
+from .sink_handler import HandleSink
+import os
+import queue
+import select
+import socket
+import struct
+import threading
+import time
+
+
+class Connection:
+
+    __slots__ = ("address", "connect_timeout", "send_timeout", "sock")
+
+    def __init__(self, address, connect_timeout, send_timeout):
+
+        self.address = address
+        self.connect_timeout = connect_timeout
+        self.send_timeout = send_timeout
+        self.sock = None
+
+    def send(self, data):
+
+        # Connects on first use and again after any failure; the caller decides when to try again
+        if self.sock is not None and not self.is_alive():
+            self.close()
+
+        if self.sock is None:
+            self.sock = socket.create_connection(self.address, timeout=self.connect_timeout)
+            self.sock.settimeout(self.send_timeout)
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+
+        try:
+
+            self.sock.sendall(data)
+
+        except OSError:
+
+            self.close()
+            raise
+
+    def is_alive(self):
+
+        # The collector never writes back, so a readable socket means it has closed its end
+        try:
+
+            readable, _, _ = select.select([self.sock], [], [], 0)
+
+        except (OSError, ValueError):
+
+            return False
+
+        return not readable
+
+    def close(self):
+
+        if self.sock is not None:
+
+            try:
+
+                self.sock.close()
+
+            except OSError:
+
+                pass
+
+            self.sock = None
+
+
+class HandleNetworkClient:
+
+    # Each frame is one batch: a 4-byte big-endian length, then each record as its own 4-byte length and UTF-8
+    # bytes. Text records span several lines, so a record can't be told apart by newlines
+    FRAME_HEADER = struct.Struct(">I")
+
+    def __init__(self, name, address, settings, spool_path):
+
+        self.name = name
+        self.address = address
+        self.batch_size = max(1, settings["batch_size"])
+        self.reconnect_delay = settings["reconnect_delay"] # seconds
+        self.spool_path = spool_path
+        self.spool_limit = settings["spool_limit"] # bytes
+
+        # Bounded, so a stalled collector pushes back on the sink's own queue and its overflow policy
+        self.frames = queue.Queue(maxsize=settings["max_pending_frames"])
+
+        self.counters = dict.fromkeys(("frames_sent", "records_sent", "bytes_sent", "reconnects", "frames_spooled",
+                                       "records_spooled", "frames_replayed", "frames_dropped"), 0)
+        self._counter_lock = threading.Lock()
+
+        # Guards the spool file and the spooling state; a replay holds it, so nothing is spooled mid-replay
+        self._spool_lock = threading.Lock()
+        self.spool_bytes = self._trim_spool()
+
+        # A spool left behind by an earlier run is replayed as soon as a connection comes up
+        self.spooling = self.spool_bytes > 0
+        self.retry_at = time.monotonic()
+
+        self.connections = [Connection(address, settings["connect_timeout"], settings["send_timeout"])
+                            for _ in range(max(1, settings["connections"]))]
+        self.senders = [threading.Thread(target=self._send_frames, args=(connection,),
+                                         name=f"logger-sink-{name}-send-{index}", daemon=True)
+                        for index, connection in enumerate(self.connections)]
+
+        for sender in self.senders:
+            sender.start()
+
+    def write(self, lines, created=None):
+
+        if not lines:
+            return
+
+        pack = HandleNetworkClient.FRAME_HEADER.pack
+
+        # A drain can hand over far more than a batch at once; frames never carry more than batch_size records
+        for start in range(0, len(lines), self.batch_size):
+
+            batch = lines[start:start + self.batch_size]
+            payload = b''.join([pack(len(data)) + data for data in (line.encode('utf-8') for line in batch)])
+
+            self.frames.put((pack(len(payload)) + payload, len(batch)))
+
+    def flush(self):
+
+        # Returns once every frame handed over so far is on a socket or in the spool
+        self.frames.join()
+
+    def close(self):
+
+        self.flush()
+
+        for _ in self.senders:
+            self.frames.put(None)
+
+        for sender in self.senders:
+            sender.join()
+
+        for connection in self.connections:
+            connection.close()
+
+    def _send_frames(self, connection):
+
+        while True:
+
+            try:
+
+                # While spooling, wake up to retry the collector even when nothing new arrives
+                item = self.frames.get(timeout=self.time_until_retry())
+
+            except queue.Empty:
+
+                with self._spool_lock:
+                    self._retry(connection)
+
+                continue
+
+            try:
+
+                if item is None:
+                    return
+
+                self.deliver(connection, *item)
+
+            finally:
+                self.frames.task_done()
+
+    def time_until_retry(self):
+
+        return max(0.0, self.retry_at - time.monotonic()) if self.spooling else None
+
+    def deliver(self, connection, frame, records):
+
+        if not self.spooling and self._send(connection, frame, records):
+            return
+
+        with self._spool_lock:
+
+            self._retry(connection)
+
+            # Spooled frames go out before new ones, so nothing is sent ahead of the backlog
+            if self.spooling or not self._send(connection, frame, records):
+                self._spool(frame, records)
+
+    def _send(self, connection, frame, records):
+
+        try:
+
+            connection.send(frame)
+
+        except OSError as error:
+
+            if not self.spooling:
+                HandleInternalMessages.log_internal_message(
+                    f"Sink '{self.name}' lost its connection to {self.address[0]}:{self.address[1]}. "
+                    f"Spooling to [{self.spool_path}]", exception_traceback=error)
+
+            self.spooling = True
+            self.retry_at = time.monotonic() + self.reconnect_delay
+
+            return False
+
+        with self._counter_lock:
+            self.counters["frames_sent"] += 1
+            self.counters["records_sent"] += records
+            self.counters["bytes_sent"] += len(frame)
+
+        return True
+
+    def _retry(self, connection):
+
+        # Called with the spool lock held
+        if not self.spooling or time.monotonic() < self.retry_at:
+            return
+
+        self.retry_at = time.monotonic() + self.reconnect_delay
+
+        try:
+
+            # An empty send connects, so a collector that is still down costs no read of the spool
+            connection.send(b"")
+
+        except OSError:
+
+            return
+
+        try:
+
+            with open(self.spool_path, 'rb') as spool:
+                backlog = spool.read()
+
+            sent, replayed, torn = self._replay(connection, backlog)
+
+            if torn:
+
+                HandleInternalMessages.log_internal_message(
+                    f"Spool [{self.spool_path}] for sink '{self.name}' ends in a partial frame. Dropping "
+                    f"its last {len(backlog) - sent} bytes")
+
+                backlog = backlog[:sent]
+
+                with self._counter_lock:
+                    self.counters["frames_dropped"] += 1
+
+            # Whatever made it out is cut from the spool so it isn't sent twice
+            with open(self.spool_path, 'wb') as spool:
+                spool.write(backlog[sent:])
+
+        except FileNotFoundError:
+
+            backlog, sent, replayed = b"", 0, 0
+
+        except OSError as error:
+
+            HandleInternalMessages.log_internal_message(
+                f"Couldn't replay the spool [{self.spool_path}] for sink '{self.name}'", exception_traceback=error)
+            return
+
+        self.spool_bytes = len(backlog) - sent
+
+        with self._counter_lock:
+            self.counters["frames_replayed"] += replayed
+
+        if sent < len(backlog):
+            return
+
+        self.spooling = False
+
+        HandleInternalMessages.log_internal_message(
+            f"Sink '{self.name}' reconnected to {self.address[0]}:{self.address[1]}. Replayed {replayed} spooled frames")
+
+        with self._counter_lock:
+            self.counters["reconnects"] += 1
+
+    def _replay(self, connection, backlog):
+
+        offset = replayed = 0
+
+        # Sent a frame at a time, so a failure leaves the spool cut at a frame boundary
+        while offset < len(backlog):
+
+            end = HandleNetworkClient.frame_end(backlog, offset)
+
+            # Only a crash mid-append leaves a partial frame, and only at the end; the caller drops it
+            if end is None:
+                return offset, replayed, True
+
+            try:
+
+                connection.send(backlog[offset:end])
+
+            except OSError:
+
+                break
+
+            offset = end
+            replayed += 1
+
+        return offset, replayed, False
+
+    @staticmethod
+    def frame_end(backlog, offset):
+
+        # Where the frame starting at offset ends, or None when the backlog stops partway through it
+        header = HandleNetworkClient.FRAME_HEADER
+
+        if offset + header.size > len(backlog):
+            return None
+
+        end = offset + header.size + header.unpack_from(backlog, offset)[0]
+
+        return end if end <= len(backlog) else None
+
+    def _trim_spool(self):
+
+        # A partial frame left by a crash is cut before anything is appended after it, so later frames stay readable
+        try:
+
+            with open(self.spool_path, 'r+b') as spool:
+
+                backlog = spool.read()
+                offset = 0
+
+                while offset < len(backlog):
+
+                    end = HandleNetworkClient.frame_end(backlog, offset)
+                    if end is None:
+                        break
+
+                    offset = end
+
+                if offset < len(backlog):
+
+                    spool.truncate(offset)
+
+                    HandleInternalMessages.log_internal_message(
+                        f"Spool [{self.spool_path}] for sink '{self.name}' ends in a partial frame. Dropping "
+                        f"its last {len(backlog) - offset} bytes")
+
+                return offset
+
+        except FileNotFoundError:
+
+            return 0
+
+        except OSError as error:
+
+            HandleInternalMessages.log_internal_message(
+                f"Couldn't read the spool [{self.spool_path}] for sink '{self.name}'", exception_traceback=error)
+
+            return 0
+
+    def _spool(self, frame, records):
+
+        # Called with the spool lock held
+        if self.spool_bytes + len(frame) > self.spool_limit:
+
+            with self._counter_lock:
+                self.counters["frames_dropped"] += 1
+
+            return
+
+        try:
+
+            with open(self.spool_path, 'ab') as spool:
+                spool.write(frame)
+
+        except OSError as error:
+
+            HandleInternalMessages.log_internal_message(
+                f"Couldn't write to the spool [{self.spool_path}] for sink '{self.name}'. Dropping a frame",
+                exception_traceback=error)
+
+            # A partial append would tear the spool, so it is cut back to its last whole frame
+            try:
+
+                os.truncate(self.spool_path, self.spool_bytes)
+
+            except OSError:
+
+                pass
+
+            with self._counter_lock:
+                self.counters["frames_dropped"] += 1
+
+            return
+
+        self.spool_bytes += len(frame)
+
+        with self._counter_lock:
+            self.counters["frames_spooled"] += 1
+            self.counters["records_spooled"] += records
+
+    def snapshot(self):
+
+        with self._counter_lock:
+            snapshot = dict(self.counters)
+
+        snapshot["spooling"] = self.spooling
+        snapshot["spool_bytes"] = self.spool_bytes
+        snapshot["pending_frames"] = self.frames.qsize()
+
+        return snapshot
+
+
+class HandleNetworkSink(HandleSink):
+
+    # Settings a network entry in output_configs.sinks may give alongside "address"
+    DEFAULTS = {
+        "connections": 1,
+        "connect_timeout": 2.0,
+        "send_timeout": 5.0,
+        "reconnect_delay": 1.0,
+        "batch_size": 500,
+        "flush_interval": 1.0,
+        "max_pending_frames": 64,
+        "spool_path": None,
+        "spool_limit": 67108864
+    }
+
+    def __init__(self, name, compiler, min_severity, queue_config, settings, default_spool_path):
+
+        super().__init__(name, compiler, min_severity, queue_config)
+
+        settings = dict(HandleNetworkSink.DEFAULTS, **settings)
+
+        self.client = HandleNetworkClient(
+            name, HandleNetworkSink.parse_address(settings["address"]), settings,
+            settings["spool_path"] or default_spool_path)
+
+        # Always batched: a frame per record would tie throughput to the network's round trip. Batches are
+        # handed to the senders without waiting for them; only an explicit flush waits
+        self.batcher = HandleBatching(self.client, settings, flush_writer=False)
+
+        self.log_buffer = []
+
+    @staticmethod
+    def parse_address(address):
+
+        # "host:port", with IPv6 hosts in brackets: "[::1]:5140"
+        host, _, port = address.rpartition(":")
+
+        return host.strip("[]"), int(port)
+
+    def time_until_flush(self):
+
+        return self.batcher.time_until_flush() if self.log_buffer else None
+
+    def emit(self, lines, created=None):
+
+        # A collector keeps no index, so the lines' times aren't carried
+        self.log_buffer.extend(lines)
+
+        if self.batcher.check_batching_condition(self.log_buffer):
+
+            self.batcher.flush(self.log_buffer)
+
+    def flush(self, durable=False):
+
+        self.batcher.flush(self.log_buffer, override=True)
+        self.client.flush()
+
+    def snapshot(self):
+
+        snapshot = super().snapshot()
+        snapshot["network"] = self.client.snapshot()
+
+        return snapshot
+
+    def close(self):
+
+        super().close()
+        self.client.close()
@@ -1,81 +1,231 @@
-import traceback
-import queue
-import time
 import atexit
 import threading
-from .batching_handler import HandleBatching
+from .sink_handler import HandleSink, HandleTerminalSink, HandleFileSink
+from .writer_handler import HandleWriter
+from .queue_handler import HandleQueue, FlushRequest
+from .internal_handler import HandleInternalMessages
+from .index_handler import HandleIndex
+from .stats_handler import HandleStats
+from .suppression_handler import HandleSuppression
+from .flight_recorder_handler import HandleFlightRecorder
 
 class HandleOutput:
 
-    def __init__(self, output_config, batch_config, file):
-        self.terminal_output = output_config["terminal"]
-        self.file_output = output_config["file"]
-        self.batch_config_toggle = batch_config["batch_logging"]
+    def __init__(self, output_config, batch_config, file, compiler, queue_config, rotation=None, index_config=None,
+                 stats=None, suppression_config=None, recorder_config=None, durability_config=None):
 
         self.file_path = file
 
+        self.compiler = compiler
 
-        self.batcher = HandleBatching(file, batch_config)
+        self.stats = stats if stats is not None else HandleStats()
 
-        self._exit_flag = False
+        self.min_severity = compiler.get_severity(output_config["min_level"])
 
-        self.log_buffer = []
+        self.sinks = self.build_sinks(
+            output_config, batch_config, file, queue_config, rotation, index_config, durability_config)
+        self.lowest_sink_severity = min((sink.min_severity for sink in self.sinks), default=None)
 
-        self.log_queue = queue.Queue()
+        self.log_queue = HandleQueue(queue_config, compiler.get_severity)
 
-        self.bg_task = threading.Thread(target=self._process_logs, daemon=True)
-        self.bg_task.start()
+        self.suppression = None
+        if suppression_config and (suppression_config["dedup"] or suppression_config["rate_limit"]):
+            self.suppression = HandleSuppression(suppression_config, self.log_queue)
+
+        self.recorder = None
+        if recorder_config and recorder_config["flight_recorder"]:
+            self.recorder = HandleFlightRecorder(recorder_config, self.log_queue, compiler.get_severity)
+
+        for sink in self.sinks:
+            sink.start()
 
-        
+        self.bg_task = threading.Thread(target=self._process_logs, name="logger-dispatch", daemon=True)
+        self.bg_task.start()
 
         atexit.register(self._flush_on_exit)
 
+    def build_sinks(self, output_config, batch_config, file, queue_config, rotation, index_config,
+                    durability_config=None):
+
+        from .config_handler import HandleConfigs
+
+        sink_configs = output_config["sinks"]
+        durability_config = durability_config or HandleConfigs.FALLBACK_CONFIGURATION["durability_configs"]
+        sinks = []
+
+        def sink_settings(name):
+
+            settings = sink_configs.get(name, {})
+            sink_queue_config = dict(queue_config)
+            sink_queue_config.update(
+                (key, settings[key]) for key in HandleSink.QUEUE_SETTINGS if key in settings)
+
+            return self.compiler.get_severity(settings.get("min_level", output_config["min_level"])), sink_queue_config
+
+        if output_config["terminal"]:
+            sinks.append(HandleTerminalSink("terminal", self.compiler, *sink_settings("terminal")))
+
+        if output_config["file"]:
+
+            index = HandleIndex(file, index_config) if index_config and index_config["index"] else None
+            writer = HandleWriter(file, batch_config["buffer_size"], rotation, index, self.stats)
+
+            sinks.append(HandleFileSink(
+                "file", self.compiler, *sink_settings("file"), writer, batch_config, durability_config))
+
+        # Any other entry with a path is an extra file, e.g. {"errors": {"path": "errors.log", "min_level": "ERROR"}},
+        # and one with an address is a collector, e.g. {"collector": {"address": "10.0.0.5:5140"}}
+        for name, settings in sink_configs.items():
+
+            if name in ("terminal", "file"):
+                continue
+
+            if isinstance(settings, dict) and settings.get("address"):
+
+                # Sockets and the sender pool are only brought in when a collector is configured
+                from .network_handler import HandleNetworkSink
+
+                try:
+
+                    sinks.append(HandleNetworkSink(
+                        name, self.compiler, *sink_settings(name), settings, f"{file}.{name}.spool"))
+
+                except (OSError, ValueError) as error:
+
+                    HandleOutput.log_internal_message(
+                        f"Couldn't set up sink '{name}' for [{settings['address']}]. Skipping it",
+                        exception_traceback=error)
+
+                continue
+
+            if not isinstance(settings, dict) or not settings.get("path"):
+                HandleOutput.log_internal_message(f"Sink '{name}' has no path or address. Skipping it")
+                continue
+
+            try:
+
+                writer = HandleWriter(settings["path"], batch_config["buffer_size"], stats=self.stats)
+
+            except OSError as error:
+
+                HandleOutput.log_internal_message(
+                    f"Couldn't open [{settings['path']}] for sink '{name}'. Skipping it", exception_traceback=error)
+                continue
+
+            sinks.append(HandleFileSink(
+                name, self.compiler, *sink_settings(name), writer, batch_config, durability_config))
+
+        return sinks
+
     def _flush_on_exit(self):
-        self.batcher.flush(self.log_buffer, override=True)
-        self._exit_flag = True
-        self.log_queue.put(None)
+
+        atexit.unregister(self._flush_on_exit)
+
+        # Whatever the recorder still holds is the lead-up to the exit, so it's written before the queue closes
+        if self.recorder is not None and self.recorder.dump_on_exit:
+            self.recorder.dump("exit")
+
+        self.log_queue.close()
 
         self.bg_task.join()
 
+        # Counts still held back by suppression go out with everything else
+        if self.suppression is not None:
+            self.route(self.suppression.sweep(force=True))
+
+        # The dispatcher has handed everything on; each sink now drains, flushes and closes
+        for sink in self.sinks:
+            sink.close()
+
     def _process_logs(self):
-        
-        while not self._exit_flag:
-            message = self.log_queue.get(timeout=15)
-            if message is None:
+
+        suppression = self.suppression
+
+        while True:
+
+            # Wake up to summarise suppressed floods even when nothing new arrives
+            records = self.log_queue.drain(suppression.time_until_sweep() if suppression is not None else None)
+            if records is None:
                 break
-            self.handle_log_output(message)
 
-    def handle_log_output(self, message):
+            flush_requests = [record for record in records if isinstance(record, FlushRequest)]
+            if flush_requests:
+                records = [record for record in records if not isinstance(record, FlushRequest)]
 
-        if self.batch_config_toggle:
+            if suppression is not None:
+                records.extend(suppression.sweep(force=bool(flush_requests)))
 
-            if self.batcher.check_batching_condition(self.log_buffer):
+            dropped = self.log_queue.pop_dropped()
+            if dropped:
+                records.append(HandleQueue.dropped_record(dropped))
 
-                self.batcher.flush(self.log_buffer)
+            # Nothing a record carries may end this loop: with it gone, every later record would be lost
+            try:
 
-            else:
+                self.route(records)
+
+            except Exception as error:
+
+                HandleInternalMessages.log_internal_message(
+                    f"Couldn't route {len(records)} records", exception_traceback=error)
+
+            for request in flush_requests:
+                self.forward_flush(request)
 
-                    self.log_buffer.append(message)
-        else:
+    def route(self, records):
 
-            if self.terminal_output:
+        severities = self.compiler.severities
+        default_severity = self.compiler.default_severity
+        render = self.compiler.render
+
+        if not self.sinks:
+            return
+
+        if self.lowest_sink_severity > self.min_severity:
+            records = [record for record in records
+                       if severities.get(record.level, default_severity) >= self.lowest_sink_severity]
+
+        # Deferred records are formatted here, once, however many sinks they go to
+        for record in records:
+            render(record)
+
+        for sink in self.sinks:
+
+            if sink.min_severity <= self.min_severity:
+                selected = records
+            else:
+                selected = [record for record in records
+                            if severities.get(record.level, default_severity) >= sink.min_severity]
 
-                print(message, flush=True)
+            # A "block" sink pushes back: the dispatcher waits for it up to block_timeout per batch, the ingress
+            # queue fills behind it and callers feel it. A sink with a drop policy never makes it wait
+            if selected:
+                queue = sink.queue
+                queue.put_many(selected, timeout=queue.block_timeout if queue.policy == "block" else 0)
 
-            if self.file_output:
+    def forward_flush(self, request):
 
-                    with open(self.file_path, 'a', encoding='utf-8') as log_file:
-                        log_file.write(f"{message}\n")
+        # A durable flush never waits on the terminal or a collector, only on what it makes durable
+        sinks = [sink for sink in self.sinks if sink.DURABLE] if request.durable else self.sinks
 
+        if not sinks:
+            request.callback()
+            return
 
+        request.pending = len(sinks)
 
+        # Queued behind everything already routed to each sink
+        for sink in sinks:
 
-    @staticmethod
-    def log_internal_message(message, exception_traceback=None):
+            if not sink.queue.put_control(request):
+                request.done()
 
-        print(f"\033[1;37m[INTERNAL] {message}")
+    def request_flush(self, callback, durable=False):
 
-        if exception_traceback:
+        # The callback runs once every sink has written everything queued before it, and synced it to disk if durable
+        if not self.log_queue.put_control(FlushRequest(callback, durable)):
+            callback()
 
-            print(
-                f"{traceback.format_exception(None, exception_traceback, exception_traceback.__traceback__)}")
+    # Kept for existing callers; the ring lives in internal_handler so the handlers below can report without a cycle
+    log_internal_message = staticmethod(HandleInternalMessages.log_internal_message)
+    configure_internal_messages = staticmethod(HandleInternalMessages.configure_internal_messages)
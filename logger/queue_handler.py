@@ -0,0 +1,289 @@
+from .internal_handler import HandleInternalMessages
+from .log_record import LogRecord
+import threading
+import time
+from collections import deque
+
+
+class FlushRequest:
+
+    __slots__ = ("callback", "durable", "pending", "_lock")
+
+    def __init__(self, callback, durable=False):
+
+        self.callback = callback
+        self.durable = durable
+        self.pending = 1
+        self._lock = threading.Lock()
+
+    def done(self):
+
+        # Each sink reports in once it has flushed; the callback runs after the last one
+        with self._lock:
+            self.pending -= 1
+            finished = self.pending == 0
+
+        if finished:
+            self.callback()
+
+
+class HandleQueue:
+
+    POLICIES = ("block", "drop_newest", "drop_oldest", "level_threshold")
+
+    def __init__(self, queue_config, get_severity):
+
+        self.capacity = queue_config["capacity"]
+        self.policy = queue_config["overflow_policy"]
+        self.block_timeout = queue_config["block_timeout"]
+
+        if self.policy not in HandleQueue.POLICIES:
+            HandleInternalMessages.log_internal_message(
+                f"Unknown overflow policy '{self.policy}'. Using 'block'")
+            self.policy = "block"
+
+        self.get_severity = get_severity
+        self.threshold = get_severity(queue_config["threshold_level"])
+
+        self._records = deque()
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._closed = False
+
+        self.dropped = {}
+
+        # Lifetime totals for stats; dropped above is reset every time it is reported
+        self.enqueued = 0
+        self.dropped_total = {}
+        self.peak_depth = 0
+
+    def __len__(self):
+
+        return len(self._records)
+
+    def empty(self):
+
+        return not self._records
+
+    def put(self, record):
+
+        with self._lock:
+
+            if self._closed:
+                return False
+
+            if 0 < self.capacity <= len(self._records) and not self._make_room(record):
+                self._count_drop(record)
+                return False
+
+            self._records.append(record)
+            self._count_enqueued()
+            self._not_empty.notify()
+
+            return True
+
+    def put_many(self, records, block=True, timeout=None):
+
+        # Returns how many records were consumed; with block=False anything that would
+        # have to wait for room is left for the caller to retry. timeout caps the wait for the
+        # whole batch instead of block_timeout per record; 0 applies the policy without waiting
+        taken = 0
+        deadline = time.monotonic() + timeout if timeout is not None else None
+
+        with self._lock:
+
+            if self._closed:
+                return len(records)
+
+            # Everything fits: one extend instead of a capacity check per record
+            if self.capacity <= 0 or len(self._records) + len(records) <= self.capacity:
+
+                self._records.extend(records)
+                self.enqueued += len(records)
+                self.peak_depth = max(self.peak_depth, len(self._records))
+
+                if records:
+                    self._not_empty.notify()
+
+                return len(records)
+
+            for record in records:
+
+                if 0 < self.capacity <= len(self._records):
+
+                    room = self._make_room(record, block, deadline)
+
+                    if room is None:
+                        break
+
+                    if not room:
+                        self._count_drop(record)
+                        taken += 1
+                        continue
+
+                self._records.append(record)
+                self._count_enqueued()
+                taken += 1
+
+            if taken:
+                self._not_empty.notify()
+
+        return taken
+
+    def put_control(self, item):
+
+        # Control items such as flush requests skip the capacity check and are never dropped
+        with self._lock:
+
+            if self._closed:
+                return False
+
+            self._records.append(item)
+            self._not_empty.notify()
+
+            return True
+
+    def get(self):
+
+        with self._lock:
+
+            while not self._records:
+
+                if self._closed:
+                    return None
+
+                self._not_empty.wait()
+
+            record = self._records.popleft()
+            self._not_full.notify()
+
+            return record
+
+    def wake(self):
+
+        # Ends a drain() that is waiting, which then returns as if its timeout had expired
+        with self._lock:
+            self._not_empty.notify_all()
+
+    def drain(self, timeout=None):
+
+        # Hands back everything queued in one go; an empty list means the timeout expired
+        with self._lock:
+
+            if not self._records and not self._closed:
+                self._not_empty.wait(timeout)
+
+            if not self._records:
+                return None if self._closed else []
+
+            records = list(self._records)
+            self._records.clear()
+            self._not_full.notify_all()
+
+            return records
+
+    def close(self):
+
+        with self._lock:
+
+            self._closed = True
+            self._not_empty.notify_all()
+            self._not_full.notify_all()
+
+    def snapshot(self):
+
+        with self._lock:
+
+            return {
+                "depth": len(self._records),
+                "peak_depth": self.peak_depth,
+                "capacity": self.capacity,
+                "enqueued": self.enqueued,
+                "dropped": sum(self.dropped_total.values()),
+                "dropped_by_level": dict(self.dropped_total)
+            }
+
+    def pop_dropped(self):
+
+        # Drops are only reported once the queue has drained back below half capacity
+        with self._lock:
+
+            if not self.dropped or len(self._records) > self.capacity // 2:
+                return None
+
+            dropped, self.dropped = self.dropped, {}
+
+            return dropped
+
+    def _make_room(self, record, block=True, deadline=None):
+
+        if self.policy == "drop_newest":
+            return False
+
+        if self.policy == "drop_oldest" and self._evict(lambda queued: True):
+            return True
+
+        if self.policy == "level_threshold":
+
+            if self.get_severity(record.level) < self.threshold:
+                return False
+
+            if self._evict(lambda queued: self.get_severity(queued.level) < self.threshold):
+                return True
+
+        return self._wait_for_room(deadline) if block else None
+
+    def _evict(self, predicate):
+
+        for index, queued in enumerate(self._records):
+
+            if isinstance(queued, LogRecord) and predicate(queued):
+                del self._records[index]
+                self._count_drop(queued)
+                return True
+
+        return False
+
+    def _wait_for_room(self, deadline=None):
+
+        # put_many may not have woken the writer yet for records it already appended
+        self._not_empty.notify()
+
+        if deadline is None:
+            deadline = time.monotonic() + self.block_timeout
+
+        while len(self._records) >= self.capacity:
+
+            remaining = deadline - time.monotonic()
+
+            if remaining <= 0 or self._closed:
+                return False
+
+            self._not_full.wait(remaining)
+
+        return True
+
+    def _count_enqueued(self):
+
+        self.enqueued += 1
+
+        if len(self._records) > self.peak_depth:
+            self.peak_depth = len(self._records)
+
+    def _count_drop(self, record):
+
+        self.dropped[record.level] = self.dropped.get(record.level, 0) + 1
+        self.dropped_total[record.level] = self.dropped_total.get(record.level, 0) + 1
+
+    @staticmethod
+    def dropped_record(dropped, sink_name=None):
+
+        counts = ", ".join(f"{level}: {count}" for level, count in dropped.items())
+
+        if sink_name is None:
+            return LogRecord("WARNING", "Dropped %d records under queue backpressure (%s)",
+                             (sum(dropped.values()), counts))
+
+        return LogRecord("WARNING", "Sink '%s' dropped %d records under backpressure (%s)",
+                         (sink_name, sum(dropped.values()), counts))
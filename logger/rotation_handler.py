@@ -1,63 +1,64 @@
 import os
-import shutil
-import sys
-from random import randint
-from datetime import datetime, timedelta
+import time
 from .output_handler import HandleOutput
+from .archive_handler import HandleArchives
 
 
 class HandleRotation:
 
-    def __init__(self, configs):
+    # Seconds before a rotation that failed is tried again
+    RETRY_DELAY = 30.0
+
+    def __init__(self, configs, stats=None):
 
         self.file_path = configs["file_locations"]["log_file_path"]
         self.archive_dir = os.path.dirname(self.file_path)
 
         self.log_rotation = configs["log_rotation_configs"]
 
+        self.size_rotation = self.log_rotation["size_rotation"]
+        self.time_rotation = self.log_rotation["time_rotation"]
         self.max_size = self.log_rotation["max_file_size"] # bytes
         self.max_age = self.log_rotation["max_file_age"] # days
 
-    def check_rotation_condition(self, full_path):
+        self.archives = HandleArchives(self.log_rotation, self.archive_dir, stats)
 
-        file_size = os.path.getsize(full_path)
-        file_age =  datetime.now() - datetime.fromtimestamp(os.path.getctime(full_path))
+        # While a rename keeps failing, the file stays over max_size; without this every line would retry it
+        self.retry_at = 0.0
 
-        return file_size >= self.max_size or file_age >= timedelta(days=self.max_age)
+    def exceeds_size(self, current_size, incoming_size):
 
-    def rotate_log_path(self):
+        # An empty file always takes the next record, however large it is
+        return self.size_rotation and current_size > 0 and current_size + incoming_size > self.max_size \
+            and time.monotonic() >= self.retry_at
 
-        HandleOutput.log_internal_message("Running rotation check")
+    def exceeds_age(self, opened_at):
 
-        if self.check_rotation_condition(self.file_path):
+        return self.time_rotation and time.time() - opened_at >= self.max_age * 86400
 
-            try:
+    def rename_rotating_log(self, index=None):
 
-                self.full_rotation()
+        archive_path = self.archives.archive_path(time.time())
 
-            except (FileNotFoundError, PermissionError) as error:
+        # Same directory, so this is an atomic rename rather than a copy
+        try:
 
-                HandleOutput.log_internal_message("An error occured whilst attempting log rotation.", exception_traceback=error)
+            os.replace(self.file_path, archive_path)
 
-    def rename_rotating_log(self):
-        archive_name = f"log_archive_{datetime.now().strftime('%d_%m_%y %H_%M_%S')}_{randint(1000, 99999)}.txt"
-        archive_path = os.path.join(self.archive_dir, archive_name)
-        
-        os.makedirs(self.archive_dir, exist_ok=True)
+        except OSError:
 
-        shutil.copy2(self.file_path, archive_path)
+            self.retry_at = time.monotonic() + HandleRotation.RETRY_DELAY
+            raise
 
-        archive_size = (os.path.getsize(archive_path) / 1024) # size in Kilobytes
-        archive_age = os.path.getmtime(archive_path) # date/time of last metadata change
+        if index is not None:
+            index.rotate(archive_path)
 
-        HandleOutput.log_internal_message(f"Log file Archived as {archive_name}.\nArchived file size: {archive_size:.4f} KB\nArchived file age: {archive_age}.")
+        HandleOutput.log_internal_message(f"Log file Archived as {os.path.basename(archive_path)}.")
 
-    def create_fresh_log(self):
+        self.archives.submit(archive_path)
 
-        with open(self.file_path, 'w'):
-            HandleOutput.log_internal_message("Cleared log file")
+        return archive_path
 
-    def full_rotation(self):
+    def close(self):
 
-        self.rename_rotating_log()
-        self.create_fresh_log()
\ No newline at end of file
+        self.archives.shutdown()
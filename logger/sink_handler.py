@@ -0,0 +1,209 @@
+from .batching_handler import HandleBatching
+from .durability_handler import HandleDurability
+from .internal_handler import HandleInternalMessages
+from .queue_handler import HandleQueue, FlushRequest
+import sys
+import threading
+
+
+class HandleSink:
+
+    # Queue settings a sink entry in output_configs may override; the rest come from queue_configs
+    QUEUE_SETTINGS = ("capacity", "overflow_policy", "block_timeout", "threshold_level")
+
+    # Seconds between attempts to flush again after an output error
+    RETRY_DELAY = 1.0
+
+    # Whether a durable flush waits for this sink; only sinks that put records on disk can make them durable
+    DURABLE = False
+
+    def __init__(self, name, compiler, min_severity, queue_config):
+
+        self.name = name
+        self.compiler = compiler
+        self.min_severity = min_severity
+
+        # Every sink drains its own queue on its own thread, so a slow one never holds up the others
+        self.queue = HandleQueue(queue_config, compiler.get_severity)
+        self.worker = threading.Thread(target=self._process_logs, name=f"logger-sink-{name}", daemon=True)
+
+        self.failing = False
+        self.reported_errors = set()
+
+    def start(self):
+
+        self.worker.start()
+
+        return self
+
+    def _process_logs(self):
+
+        while True:
+
+            records = self.queue.drain(HandleSink.RETRY_DELAY if self.failing else self.time_until_flush())
+            if records is None:
+                break
+
+            flush_requests = [record for record in records if isinstance(record, FlushRequest)]
+            if flush_requests:
+                records = [record for record in records if not isinstance(record, FlushRequest)]
+
+            # Whatever a failed write left in the writer's buffer goes out first
+            if self.failing:
+                self.attempt(self.flush)
+
+            self.attempt(self.write, records)
+
+            if flush_requests:
+                self.attempt(self.flush, any(request.durable for request in flush_requests))
+
+                # Answered even after a failure, so nobody waiting on flush() hangs; the data is retried
+                for request in flush_requests:
+                    request.done()
+
+            dropped = self.queue.pop_dropped()
+            if dropped:
+                record = HandleQueue.dropped_record(dropped, self.name)
+                self.attempt(self.emit, [self.compiler.render(record)], [record.created])
+
+    def attempt(self, operation, *args):
+
+        # No error ends the sink's thread, or flush requests would go unanswered. An OSError is usually passing
+        # (a full disk), so the sink keeps retrying; anything else won't clear up on a retry and costs what failed
+        try:
+
+            operation(*args)
+
+        except OSError as error:
+
+            if not self.failing:
+                HandleInternalMessages.log_internal_message(
+                    f"Sink '{self.name}' couldn't write its output. Retrying every {HandleSink.RETRY_DELAY}s",
+                    exception_traceback=error)
+
+            self.failing = True
+            return
+
+        except Exception as error:
+
+            if type(error) not in self.reported_errors:
+                self.reported_errors.add(type(error))
+                HandleInternalMessages.log_internal_message(
+                    f"Sink '{self.name}' couldn't write its output. Skipping what failed", exception_traceback=error)
+
+            return
+
+        if self.failing and operation == self.flush:
+            self.failing = False
+            HandleInternalMessages.log_internal_message(f"Sink '{self.name}' is writing again")
+
+    def time_until_flush(self):
+
+        return None
+
+    def write(self, records):
+
+        # Records arrive already rendered by the dispatcher; each line keeps its record's time for the index
+        self.emit([record.text for record in records], [record.created for record in records])
+
+    def emit(self, lines, created=None):
+
+        raise NotImplementedError
+
+    def flush(self, durable=False):
+
+        pass
+
+    def snapshot(self):
+
+        return self.queue.snapshot()
+
+    def close(self):
+
+        self.queue.close()
+        self.worker.join()
+        self.attempt(self.flush)
+
+
+class HandleTerminalSink(HandleSink):
+
+    def emit(self, lines, created=None):
+
+        if not lines:
+            return
+
+        text = '\n'.join(lines)
+
+        try:
+
+            print(text, flush=True)
+
+        except UnicodeEncodeError:
+
+            # A terminal that can't show a character gets an escape for it rather than losing the batch
+            encoding = sys.stdout.encoding or 'ascii'
+            print(text.encode(encoding, 'backslashreplace').decode(encoding), flush=True)
+
+
+class HandleFileSink(HandleSink):
+
+    DURABLE = True
+
+    def __init__(self, name, compiler, min_severity, queue_config, writer, batch_config, durability_config):
+
+        super().__init__(name, compiler, min_severity, queue_config)
+
+        self.writer = writer
+        self.durability = HandleDurability(durability_config, writer, compiler.get_severity)
+        self.batch_config_toggle = batch_config["batch_logging"]
+        self.batcher = HandleBatching(writer, batch_config, self.durability.flush_writes)
+
+        self.log_buffer = []
+        self.log_buffer_created = []
+
+    def time_until_flush(self):
+
+        # Wake up for the flush and fsync deadlines even when nothing new arrives
+        deadlines = [self.batcher.time_until_flush() if self.batch_config_toggle and self.log_buffer else None,
+                     self.durability.time_until_sync()]
+
+        return min((deadline for deadline in deadlines if deadline is not None), default=None)
+
+    def write(self, records):
+
+        super().write(records)
+
+        # Everything the sink has been handed so far goes into one fsync, however many callers it came from
+        if self.durability.requires_sync(records):
+            self.flush(durable=True)
+
+    def emit(self, lines, created=None):
+
+        if self.batch_config_toggle:
+
+            self.log_buffer.extend(lines)
+            self.log_buffer_created.extend(created)
+
+            if self.batcher.check_batching_condition(self.log_buffer):
+
+                self.batcher.flush(self.log_buffer, created=self.log_buffer_created)
+
+        elif lines:
+
+            self.writer.write(lines, created)
+
+            if self.durability.flush_writes:
+                self.writer.flush()
+
+    def flush(self, durable=False):
+
+        self.batcher.flush(self.log_buffer, override=True, created=self.log_buffer_created)
+        self.writer.flush()
+
+        if durable:
+            self.durability.sync()
+
+    def close(self):
+
+        super().close()
+        self.writer.close()
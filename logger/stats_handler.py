@@ -0,0 +1,104 @@
+from bisect import bisect_left
+import threading
+
+
+class Histogram:
+
+    # Geometric buckets: cheap to update and good enough for percentiles across several orders of magnitude
+    SECONDS = tuple(1e-6 * 2 ** exponent for exponent in range(32))
+    COUNTS = tuple(2 ** exponent for exponent in range(24))
+
+    def __init__(self, bounds):
+
+        self.bounds = bounds
+        self.buckets = [0] * (len(bounds) + 1)
+
+        self.count = 0
+        self.total = 0
+        self.minimum = None
+        self.maximum = None
+
+    def observe(self, value):
+
+        self.buckets[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+
+        if self.minimum is None or value < self.minimum:
+            self.minimum = value
+
+        if self.maximum is None or value > self.maximum:
+            self.maximum = value
+
+    def percentile(self, rank):
+
+        if not self.count:
+            return None
+
+        target = rank / 100 * self.count
+        seen = 0
+
+        for index, bucket in enumerate(self.buckets):
+
+            seen += bucket
+
+            if bucket and seen >= target:
+                # A bucket's upper bound, clamped so an estimate never exceeds what was observed
+                upper = self.bounds[index] if index < len(self.bounds) else self.maximum
+                return min(upper, self.maximum)
+
+        return self.maximum
+
+    def snapshot(self):
+
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else None,
+            "min": self.minimum,
+            "max": self.maximum,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99)
+        }
+
+
+class HandleStats:
+
+    COUNTERS = ("records_written", "bytes_written", "disk_writes", "fsyncs", "rotations", "archives_compressed")
+    HISTOGRAMS = {
+        "flush_latency": Histogram.SECONDS,
+        "batch_size": Histogram.COUNTS,
+        "fsync_latency": Histogram.SECONDS,
+        "records_per_fsync": Histogram.COUNTS,
+        "rotation_duration": Histogram.SECONDS,
+        "compression_duration": Histogram.SECONDS
+    }
+
+    def __init__(self):
+
+        # Updated by the writer thread and the archive pool, read by whoever calls Logger.stats()
+        self._lock = threading.Lock()
+
+        self.counters = dict.fromkeys(HandleStats.COUNTERS, 0)
+        self.histograms = {name: Histogram(bounds) for name, bounds in HandleStats.HISTOGRAMS.items()}
+
+    def increment(self, name, amount=1):
+
+        with self._lock:
+            self.counters[name] += amount
+
+    def observe(self, name, value):
+
+        with self._lock:
+            self.histograms[name].observe(value)
+
+    def snapshot(self):
+
+        with self._lock:
+
+            snapshot = dict(self.counters)
+
+            for name, histogram in self.histograms.items():
+                snapshot[name] = histogram.snapshot()
+
+        return snapshot
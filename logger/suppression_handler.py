@@ -0,0 +1,199 @@
+from .log_record import LogRecord
+from collections import OrderedDict
+import threading
+import time
+
+
+class CallSite:
+
+    __slots__ = ("code", "level", "tokens", "refilled", "message", "args", "exception_type", "last_emitted",
+                 "suppressed", "suppressed_since", "identical")
+
+    def __init__(self, code, level, tokens, now):
+
+        # Held so the code object's id, which is part of the key, can't be reused while this entry exists
+        self.code = code
+        self.level = level
+        self.tokens = tokens
+        self.refilled = now
+
+        # The last record let through, which later identical ones are compared against
+        self.message = None
+        self.args = None
+        self.exception_type = None
+        self.last_emitted = None
+
+        self.suppressed = 0
+        self.suppressed_since = None
+        self.identical = True
+
+
+class HandleSuppression:
+
+    def __init__(self, suppression_config, log_queue):
+
+        self.dedup = suppression_config["dedup"]
+        self.dedup_window = suppression_config["dedup_window"] # seconds
+        self.rate_limit = suppression_config["rate_limit"]
+        self.rate = suppression_config["rate"] # records per second per call site
+        self.burst = suppression_config["burst"]
+        self.max_fingerprints = max(1, suppression_config["max_fingerprints"])
+        self.summary_interval = suppression_config["summary_interval"] # seconds
+
+        self.log_queue = log_queue
+
+        self._sites = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Read without the lock by the dispatcher to decide whether it needs a sweep timer
+        self.pending = False
+        self.next_sweep = time.monotonic()
+        self.suppressed_total = 0
+
+    def allow(self, level, message, args, exception, frame):
+
+        # Keyed on the code object's id and line: hashing the code object itself hashes its bytecode
+        code = frame.f_code
+        key = (id(code), frame.f_lineno, level)
+        exception_type = type(exception) if exception is not None else None
+        now = time.monotonic()
+        summaries = []
+        started = False
+
+        with self._lock:
+
+            site = self._sites.get(key)
+
+            if site is None:
+
+                site = self._sites[key] = CallSite(code, level, self.burst, now)
+
+                if len(self._sites) > self.max_fingerprints:
+                    _, evicted = self._sites.popitem(last=False)
+                    self._collect(evicted, now, summaries)
+
+            else:
+                self._sites.move_to_end(key)
+
+            duplicate = self.is_duplicate(site, message, args, exception_type, now)
+
+            if duplicate or self.is_rate_limited(site, now):
+
+                if not site.suppressed:
+                    site.suppressed_since = now
+
+                if site.message is None:
+                    site.message, site.args = message, args
+
+                site.suppressed += 1
+                site.identical = site.identical and duplicate
+                self.suppressed_total += 1
+
+                started = not self.pending
+                self.pending = True
+
+                if now - site.suppressed_since >= self.summary_interval:
+                    self._collect(site, now, summaries)
+
+                allowed = False
+
+            else:
+
+                # A flood that just ended is summarised ahead of the record that follows it
+                if site.suppressed:
+                    self._collect(site, now, summaries)
+
+                site.message, site.args, site.exception_type = message, args, exception_type
+                site.last_emitted = now
+                allowed = True
+
+        # Control puts never wait for room, so log() can't block here, AsyncLogger's loop included
+        for summary in summaries:
+            self.log_queue.put_control(summary)
+
+        # The dispatcher may be parked in drain() with no timeout; it needs to pick up the sweep timer
+        if started and not summaries:
+            self.log_queue.wake()
+
+        return allowed
+
+    def is_duplicate(self, site, message, args, exception_type, now):
+
+        return self.dedup and site.last_emitted is not None and now - site.last_emitted < self.dedup_window \
+            and exception_type is site.exception_type and message == site.message and args == site.args
+
+    def is_rate_limited(self, site, now):
+
+        if not self.rate_limit:
+            return False
+
+        site.tokens = min(self.burst, site.tokens + (now - site.refilled) * self.rate)
+        site.refilled = now
+
+        if site.tokens < 1:
+            return True
+
+        site.tokens -= 1
+
+        return False
+
+    def sweep(self, force=False):
+
+        # Summarises floods that have gone quiet, so their counts aren't held back forever
+        now = time.monotonic()
+        summaries = []
+
+        if not self.pending or (not force and now < self.next_sweep):
+            return summaries
+
+        with self._lock:
+
+            self.next_sweep = now + self.summary_interval
+
+            pending = False
+
+            for site in self._sites.values():
+
+                if not site.suppressed:
+                    continue
+
+                if force or now - site.suppressed_since >= self.summary_interval:
+                    self._collect(site, now, summaries)
+                else:
+                    pending = True
+
+            self.pending = pending
+
+        return summaries
+
+    def time_until_sweep(self):
+
+        return max(0.0, self.next_sweep - time.monotonic()) if self.pending else None
+
+    def snapshot(self):
+
+        with self._lock:
+
+            return {
+                "suppressed": self.suppressed_total,
+                "fingerprints": len(self._sites),
+                "pending": sum(site.suppressed for site in self._sites.values())
+            }
+
+    @staticmethod
+    def _collect(site, now, summaries):
+
+        if not site.suppressed:
+            return
+
+        last_message = LogRecord(site.level, site.message, site.args).get_message()
+        summary = "%s [repeated %d times over %.1fs]" if site.identical \
+            else "%s [%d more records from this call site suppressed over %.1fs]"
+
+        summaries.append(LogRecord(
+            site.level, summary, (last_message, site.suppressed, now - site.suppressed_since),
+            extra={"suppressed": site.suppressed}))
+
+        site.suppressed = 0
+        site.suppressed_since = None
+        site.identical = True
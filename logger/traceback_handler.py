@@ -0,0 +1,170 @@
+from .output_handler import HandleOutput
+from collections import OrderedDict
+import threading
+
+
+class HandleTracebacks:
+
+    RENDER_MODES = ("writer", "caller")
+
+    CAUSE_SEPARATOR = "\nThe above exception was the direct cause of the following exception:\n\n"
+    CONTEXT_SEPARATOR = "\nDuring handling of the above exception, another exception occurred:\n\n"
+
+    def __init__(self, traceback_config):
+
+        self.cache_enabled = traceback_config["cache"]
+        self.cache_size = max(1, traceback_config["cache_size"])
+        self.max_depth = traceback_config["max_depth"] # frames per exception, innermost kept; 0 keeps all
+        self.chain = traceback_config["chain"]
+        self.max_chain = traceback_config["max_chain"] # chained exceptions shown; 0 shows the whole chain
+
+        self.render = traceback_config["render"]
+        if self.render not in HandleTracebacks.RENDER_MODES:
+            HandleOutput.log_internal_message(
+                f"Unknown traceback render mode '{self.render}'. Using 'writer'")
+            self.render = "writer"
+
+        self.render_on_caller = self.render == "caller"
+
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def format(self, error):
+
+        # Newest first while walking the chain, reversed at the end so the root cause reads first
+        parts = [self.format_single(error)]
+        seen = {id(error)}
+        chained = 0
+        current = error
+
+        while self.chain:
+
+            if current.__cause__ is not None:
+                following, separator = current.__cause__, HandleTracebacks.CAUSE_SEPARATOR
+            elif current.__context__ is not None and not current.__suppress_context__:
+                following, separator = current.__context__, HandleTracebacks.CONTEXT_SEPARATOR
+            else:
+                break
+
+            if id(following) in seen:
+                break
+
+            if self.max_chain and chained >= self.max_chain:
+                parts.append(f"[{self.count_chain(current, seen)} earlier chained exceptions omitted]\n")
+                break
+
+            parts.append(separator)
+            parts.append(self.format_single(following))
+
+            seen.add(id(following))
+            chained += 1
+            current = following
+
+        return ''.join(reversed(parts))
+
+    @staticmethod
+    def count_chain(current, seen):
+
+        count = 0
+
+        while True:
+
+            following = current.__cause__ or (None if current.__suppress_context__ else current.__context__)
+
+            if following is None or id(following) in seen:
+                return count
+
+            seen.add(id(following))
+            count += 1
+            current = following
+
+    def format_single(self, error):
+
+        # The fingerprint is cheap to build: no source lines are read and nothing is formatted
+        locations = []
+        frame = error.__traceback__
+
+        while frame is not None:
+            code = frame.tb_frame.f_code
+            locations.append((code.co_filename, frame.tb_lineno, code.co_name))
+            frame = frame.tb_next
+
+        omitted = 0
+
+        if self.max_depth and len(locations) > self.max_depth:
+            omitted = len(locations) - self.max_depth
+            locations = locations[omitted:]
+
+        # The final "Type: message" line is rebuilt every time; only the frames are shared
+        message = HandleTracebacks.format_message(error)
+
+        if not locations:
+            return message
+
+        return self.format_frames(type(error), tuple(locations), omitted) + message
+
+    @staticmethod
+    def format_message(error):
+
+        error_type = type(error)
+
+        # format_exception_only walks the whole traceback and chain again; only SyntaxError's layout needs it
+        if issubclass(error_type, SyntaxError):
+            import traceback
+            return ''.join(traceback.format_exception_only(error_type, error))
+
+        name = error_type.__qualname__
+        if error_type.__module__ not in ("__main__", "builtins"):
+            name = f"{error_type.__module__}.{name}"
+
+        try:
+
+            text = str(error)
+
+        except Exception:
+
+            text = "<exception str() failed>"
+
+        message = f"{name}: {text}\n" if text else f"{name}\n"
+        notes = getattr(error, "__notes__", None)
+
+        if isinstance(notes, (list, tuple)):
+            message += ''.join(f"{note}\n" for note in notes)
+
+        return message
+
+    def format_frames(self, error_type, locations, omitted):
+
+        key = (error_type, locations, omitted)
+
+        if self.cache_enabled:
+
+            with self._lock:
+
+                frames = self._cache.get(key)
+
+                if frames is not None:
+                    self._cache.move_to_end(key)
+                    return frames
+
+        import traceback
+
+        summary = traceback.StackSummary.from_list(
+            [traceback.FrameSummary(filename, lineno, name) for filename, lineno, name in locations])
+
+        frames = ''.join((
+            "Traceback (most recent call last):\n",
+            f"  [{omitted} outer frames omitted]\n" if omitted else "",
+            *summary.format()
+        ))
+
+        if self.cache_enabled:
+
+            with self._lock:
+
+                self._cache[key] = frames
+
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        return frames
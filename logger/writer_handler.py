@@ -0,0 +1,240 @@
+from .internal_handler import HandleInternalMessages
+from .stats_handler import HandleStats
+import os
+import threading
+import time
+
+
+class HandleWriter:
+
+    OPEN_FLAGS = os.O_WRONLY | os.O_APPEND | os.O_CREAT
+
+    # File contents are what matter after a crash; fdatasync skips the metadata-only updates fsync also waits for
+    SYNC = getattr(os, "fdatasync", os.fsync)
+
+    def __init__(self, file, buffer_size=65536, rotation=None, index=None, stats=None):
+
+        self.file_path = file
+        self.buffer_size = buffer_size
+        self.rotation = rotation
+        self.index = index
+        self.stats = stats if stats is not None else HandleStats()
+
+        # Rotation is driven by what this writer has written, not by polling the file
+        self.bytes_written = 0
+        self.opened_at = time.time()
+
+        # Set by the file sink when a durability mode asks for fsync; the file is then also synced before rotation and close
+        self.sync_on_close = False
+        self.unsynced_records = 0
+        self._pending_records = 0
+
+        self._buffer = bytearray()
+        self._lock = threading.Lock()
+
+        self._fd = None
+        self.open()
+
+    def open(self):
+
+        with self._lock:
+
+            if self._fd is None:
+                self._open_fd()
+
+    def write(self, lines, created=None):
+
+        with self._lock:
+
+            rotation = self.rotation
+            index = self.index if created is not None else None
+            error = None
+
+            if rotation is not None and rotation.exceeds_age(self.opened_at):
+                error, rotation = self._try_rotate()
+
+            # created holds each line's time. The buffer is only ever trimmed in place, so it can be held locally
+            buffer = self._buffer
+            note = index.note if index is not None else None
+
+            for position, line in enumerate(lines):
+
+                data = line.encode('utf-8') + b'\n'
+
+                if rotation is not None and rotation.exceeds_size(self.bytes_written + len(buffer), len(data)):
+                    error, rotation = self._try_rotate()
+
+                # A rotation reopens the index, so the line after one starts the new file's entries
+                if note is not None:
+                    note(created[position], self.bytes_written + len(buffer), len(data))
+
+                buffer += data
+
+            if lines:
+                self._pending_records += len(lines)
+                self.stats.increment("records_written", len(lines))
+                self.stats.observe("batch_size", len(lines))
+
+            # Raised once every line is buffered, so the sink retries the flush instead of losing the batch
+            if error is not None:
+                raise error
+
+            if len(self._buffer) >= self.buffer_size:
+                self._write_buffer()
+
+    def flush(self):
+
+        with self._lock:
+            self._write_buffer()
+
+    def sync(self):
+
+        # One fsync covers every record written so far, however many batches that took
+        with self._lock:
+
+            self._write_buffer()
+            self._sync()
+
+    @property
+    def unsynced(self):
+
+        return self.unsynced_records > 0
+
+    def reopen(self):
+
+        with self._lock:
+
+            self._write_buffer()
+            self._close_fd()
+            self._open_fd()
+
+    def close(self):
+
+        with self._lock:
+
+            self._write_buffer()
+
+            if self.sync_on_close:
+                self._sync()
+
+            self._close_fd()
+
+            if self.index is not None:
+                self.index.close()
+
+        if self.rotation is not None:
+            self.rotation.close()
+
+    def _write_buffer(self):
+
+        if not self._buffer:
+            return
+
+        # Only a failed reopen leaves records without a file; trying again raises if it still fails, so the sink
+        # keeps retrying instead of reporting a flush that wrote nothing
+        if self._fd is None:
+            self._open_fd()
+
+        started = time.perf_counter()
+        view = memoryview(self._buffer)
+        written = 0
+
+        try:
+
+            while written < len(view):
+                written += os.write(self._fd, view[written:])
+
+        finally:
+            view.release()
+            # Trimming in place keeps the bytearray's allocation around for the next batch
+            del self._buffer[:written]
+            self.bytes_written += written
+
+            if not self._buffer:
+                self.unsynced_records += self._pending_records
+                self._pending_records = 0
+
+            self.stats.increment("bytes_written", written)
+            self.stats.increment("disk_writes")
+            self.stats.observe("flush_latency", time.perf_counter() - started)
+
+        if self.index is not None:
+            self.index.flush()
+
+    def _sync(self):
+
+        if not self.unsynced_records or self._fd is None:
+            return
+
+        started = time.perf_counter()
+
+        try:
+
+            HandleWriter.SYNC(self._fd)
+
+        except OSError as error:
+
+            # Not retried: after a failed fsync the kernel may already have dropped the dirty pages
+            HandleInternalMessages.log_internal_message("Couldn't fsync the log file.", exception_traceback=error)
+            self.unsynced_records = 0
+            return
+
+        self.stats.increment("fsyncs")
+        self.stats.observe("fsync_latency", time.perf_counter() - started)
+        self.stats.observe("records_per_fsync", self.unsynced_records)
+
+        self.unsynced_records = 0
+
+    def _try_rotate(self):
+
+        # Returns the error and None when the rotation failed, so the rest of the batch doesn't retry it on every line
+        try:
+
+            self._rotate()
+
+        except OSError as error:
+
+            return error, None
+
+        return None, self.rotation
+
+    def _rotate(self):
+
+        self._write_buffer()
+
+        if self.sync_on_close:
+            self._sync()
+
+        self._close_fd()
+
+        started = time.perf_counter()
+
+        try:
+
+            self.rotation.rename_rotating_log(self.index)
+            self.bytes_written = 0
+
+        except OSError as error:
+
+            HandleInternalMessages.log_internal_message(
+                "An error occured whilst attempting log rotation. Writing on to the current file",
+                exception_traceback=error)
+
+        finally:
+            # Reopened whatever happened, so the writer is never left without a file
+            self._open_fd()
+
+        self.stats.increment("rotations")
+        self.stats.observe("rotation_duration", time.perf_counter() - started)
+
+    def _open_fd(self):
+
+        self._fd = os.open(self.file_path, HandleWriter.OPEN_FLAGS, 0o644)
+        self.bytes_written = os.fstat(self._fd).st_size
+        self.opened_at = time.time()
+
+    def _close_fd(self):
+
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None